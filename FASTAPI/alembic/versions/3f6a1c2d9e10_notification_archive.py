@@ -0,0 +1,43 @@
+"""notification archive and inbox index
+
+Revision ID: 3f6a1c2d9e10
+Revises: b4acf22b7477
+Create Date: 2026-10-19 10:12:41.208531
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6a1c2d9e10'
+down_revision: Union[str, None] = 'b4acf22b7477'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notifications_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.String(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('archived_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notifications_archive_user_created', 'notifications_archive', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_notifications_user_created', 'notifications', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_notifications_read_created', 'notifications', ['created_at'], unique=False, postgresql_where=sa.text('is_read'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_read_created', table_name='notifications')
+    op.drop_index('ix_notifications_user_created', table_name='notifications')
+    op.drop_index('ix_notifications_archive_user_created', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
@@ -0,0 +1,56 @@
+"""feature vote slots
+
+Revision ID: 5d3a8f21b9c7
+Revises: e2b7c91a4f60
+Create Date: 2026-10-19 15:47:12.604391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d3a8f21b9c7'
+down_revision: Union[str, None] = 'e2b7c91a4f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('feature_votes', sa.Column('slot', sa.Integer(), nullable=True))
+    # Number existing votes per user in the order they were cast
+    op.execute("""
+        UPDATE feature_votes AS v
+        SET slot = numbered.slot
+        FROM (
+            SELECT user_id, feature_id,
+                   row_number() OVER (PARTITION BY user_id ORDER BY voted_at, feature_id) AS slot
+            FROM feature_votes
+        ) AS numbered
+        WHERE v.user_id = numbered.user_id AND v.feature_id = numbered.feature_id
+    """)
+    op.alter_column('feature_votes', 'slot', nullable=False)
+    op.create_unique_constraint('uc_feature_vote_user_slot', 'feature_votes', ['user_id', 'slot'])
+    # Counters may have drifted from lost updates; recompute them once
+    op.execute("""
+        UPDATE features
+        SET vote_count = (SELECT count(*) FROM feature_votes WHERE feature_id = features.id)
+    """)
+    op.execute("""
+        UPDATE comments
+        SET like_count = (SELECT count(*) FROM comment_likes WHERE comment_id = comments.id),
+            reply_count = (SELECT count(*) FROM comment_replies WHERE comment_id = comments.id)
+    """)
+    op.execute("""
+        UPDATE comment_replies
+        SET like_count = (SELECT count(*) FROM comment_reply_likes WHERE reply_id = comment_replies.id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uc_feature_vote_user_slot', 'feature_votes', type_='unique')
+    op.drop_column('feature_votes', 'slot')
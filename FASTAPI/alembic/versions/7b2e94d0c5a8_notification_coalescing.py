@@ -0,0 +1,44 @@
+"""notification coalescing columns
+
+Revision ID: 7b2e94d0c5a8
+Revises: 3f6a1c2d9e10
+Create Date: 2026-10-19 11:03:17.554102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e94d0c5a8'
+down_revision: Union[str, None] = '3f6a1c2d9e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications', sa.Column('kind', sa.String(), nullable=True))
+    op.add_column('notifications', sa.Column('event_id', sa.Integer(), nullable=True))
+    op.add_column('notifications', sa.Column('actor_count', sa.Integer(), server_default='1', nullable=False))
+    op.create_foreign_key('notifications_event_id_fkey', 'notifications', 'events', ['event_id'], ['id'], ondelete='CASCADE')
+    op.create_index('ix_notifications_coalesce', 'notifications', ['user_id', 'kind', 'event_id'], unique=False, postgresql_where=sa.text('NOT is_read'))
+
+    op.add_column('notifications_archive', sa.Column('kind', sa.String(), nullable=True))
+    op.add_column('notifications_archive', sa.Column('event_id', sa.Integer(), nullable=True))
+    op.add_column('notifications_archive', sa.Column('actor_count', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('notifications_archive', 'actor_count')
+    op.drop_column('notifications_archive', 'event_id')
+    op.drop_column('notifications_archive', 'kind')
+
+    op.drop_index('ix_notifications_coalesce', table_name='notifications')
+    op.drop_constraint('notifications_event_id_fkey', 'notifications', type_='foreignkey')
+    op.drop_column('notifications', 'actor_count')
+    op.drop_column('notifications', 'event_id')
+    op.drop_column('notifications', 'kind')
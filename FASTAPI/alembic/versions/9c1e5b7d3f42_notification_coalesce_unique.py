@@ -0,0 +1,46 @@
+"""unique open notification per user, kind and event
+
+Revision ID: 9c1e5b7d3f42
+Revises: 5d3a8f21b9c7
+Create Date: 2026-10-19 18:21:40.118273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e5b7d3f42'
+down_revision: Union[str, None] = '5d3a8f21b9c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications', sa.Column('actor_ids', postgresql.ARRAY(sa.Integer()), server_default='{}', nullable=False))
+    # Concurrent likes may have left several open notifications for the same
+    # event; keep the newest open and mark the others read
+    op.execute("""
+        UPDATE notifications AS n
+        SET is_read = true
+        FROM (
+            SELECT id,
+                   row_number() OVER (PARTITION BY user_id, kind, event_id ORDER BY created_at DESC, id DESC) AS position
+            FROM notifications
+            WHERE NOT is_read AND kind IS NOT NULL
+        ) AS duplicates
+        WHERE n.id = duplicates.id AND duplicates.position > 1
+    """)
+    op.drop_index('ix_notifications_coalesce', table_name='notifications')
+    op.create_index('ix_notifications_coalesce', 'notifications', ['user_id', 'kind', 'event_id'], unique=True, postgresql_where=sa.text('NOT is_read'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_coalesce', table_name='notifications')
+    op.create_index('ix_notifications_coalesce', 'notifications', ['user_id', 'kind', 'event_id'], unique=False, postgresql_where=sa.text('NOT is_read'))
+    op.drop_column('notifications', 'actor_ids')
@@ -0,0 +1,33 @@
+"""event like count
+
+Revision ID: a91d3e5f7c24
+Revises: 7b2e94d0c5a8
+Create Date: 2026-10-19 11:48:02.913377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91d3e5f7c24'
+down_revision: Union[str, None] = '7b2e94d0c5a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE events SET like_count = likes.count
+        FROM (SELECT event_id, count(*) AS count FROM event_likes GROUP BY event_id) AS likes
+        WHERE likes.event_id = events.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'like_count')
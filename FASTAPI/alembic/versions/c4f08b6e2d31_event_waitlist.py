@@ -0,0 +1,37 @@
+"""event waitlist
+
+Revision ID: c4f08b6e2d31
+Revises: a91d3e5f7c24
+Create Date: 2026-10-19 12:31:55.072819
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f08b6e2d31'
+down_revision: Union[str, None] = 'a91d3e5f7c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('event_waitlist',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('joined_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'user_id')
+    )
+    op.create_index('ix_event_waitlist_event_joined', 'event_waitlist', ['event_id', 'joined_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_event_waitlist_event_joined', table_name='event_waitlist')
+    op.drop_table('event_waitlist')
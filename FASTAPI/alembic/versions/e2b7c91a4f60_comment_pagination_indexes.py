@@ -0,0 +1,30 @@
+"""comment pagination indexes
+
+Revision ID: e2b7c91a4f60
+Revises: c4f08b6e2d31
+Create Date: 2026-10-19 15:02:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c91a4f60'
+down_revision: Union[str, None] = 'c4f08b6e2d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_comments_created_id', 'comments', ['created_at', 'id'], unique=False)
+    op.create_index('ix_comment_replies_comment_created_id', 'comment_replies', ['comment_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comment_replies_comment_created_id', table_name='comment_replies')
+    op.drop_index('ix_comments_created_id', table_name='comments')
@@ -0,0 +1,98 @@
+# FASTAPI/app/background.py
+import asyncio
+import logging
+import os
+from typing import Callable, List
+
+import redis
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .database import SessionLocal, get_redis
+from .services.notification_service import NotificationService
+from .services.event_counter_service import EventCounterService
+from .services.storage_gc_service import StorageGCService
+
+logger = logging.getLogger(__name__)
+
+
+def _claim_run(name: str, interval: int) -> bool:
+    """
+    Claim this interval's run of a job. Every gunicorn worker schedules the
+    same jobs, so the first worker to set the key wins and the key expiring
+    with the interval hands the next run to whoever gets there first.
+    """
+    try:
+        return bool(get_redis().set(f"jobs:lock:{name}", os.getpid(), nx=True, ex=interval))
+    except redis.RedisError:
+        return False
+
+
+async def run_periodic(name: str, interval: int, job: Callable[[], None]):
+    """Run a blocking job every `interval` seconds on the threadpool"""
+    while True:
+        await asyncio.sleep(interval)
+        
+        if not _claim_run(name, interval):
+            continue
+        
+        try:
+            await run_in_threadpool(job)
+        except Exception:
+            logger.exception("Background job %s failed", name)
+
+
+def archive_notifications():
+    """Move old read notifications out of the inbox table"""
+    db = SessionLocal()
+    try:
+        moved = NotificationService.archive_read_notifications(
+            db, older_than_days=settings.NOTIFICATION_RETENTION_DAYS
+        )
+        logger.info("Archived %d read notifications", moved)
+    finally:
+        db.close()
+
+
+def flush_event_counters():
+    """Write buffered like/RSVP counter deltas to the events table"""
+    db = SessionLocal()
+    try:
+        EventCounterService.flush(db)
+    finally:
+        db.close()
+
+
+def reconcile_event_counters():
+    """Recount event counters from event_likes and rsvps to correct any drift"""
+    db = SessionLocal()
+    try:
+        EventCounterService.reconcile(db)
+    finally:
+        db.close()
+
+
+def collect_storage_garbage():
+    """Delete bucket objects no user or event references any more"""
+    db = SessionLocal()
+    try:
+        deleted = StorageGCService.collect(db, grace_hours=settings.STORAGE_GC_GRACE_HOURS)
+        logger.info("Deleted %d orphaned storage objects", deleted)
+    finally:
+        db.close()
+
+
+# (name, interval in seconds, job)
+PERIODIC_JOBS = [
+    ("archive_notifications", settings.NOTIFICATION_ARCHIVE_INTERVAL, archive_notifications),
+    ("flush_event_counters", settings.EVENT_COUNTER_FLUSH_INTERVAL, flush_event_counters),
+    ("reconcile_event_counters", settings.EVENT_COUNTER_RECONCILE_INTERVAL, reconcile_event_counters),
+    ("collect_storage_garbage", settings.STORAGE_GC_INTERVAL, collect_storage_garbage),
+]
+
+
+def start_periodic_jobs() -> List[asyncio.Task]:
+    return [
+        asyncio.create_task(run_periodic(name, interval, job))
+        for name, interval, job in PERIODIC_JOBS
+    ]
@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,6 +10,13 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
+    DEBUG: bool = False  # adds per-request DB stats headers to responses
+    LOG_LEVEL: str = "INFO"  # level of the app.* loggers (request and slow-query logs)
+    SLOW_QUERY_MS: int = 200  # statements slower than this are logged with their endpoint
+    PROFILING_ENABLED: bool = False  # opt-in /debug/profile and per-request profiling
+    PROFILING_TOKEN: Optional[str] = None  # value of the X-Profile header that profiles a single request
+    METRICS_TOKEN: Optional[str] = None  # bearer token Prometheus must send to /metrics; unset disables it
+    ADMIN_USER_IDS: List[int] = []  # JSON list in the environment, e.g. [1, 2]
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
@@ -17,6 +25,25 @@ class Settings(BaseSettings):
     SPACES_ENDPOINT: str
     SPACES_KEY: str
     SPACES_SECRET: str
+    STORAGE_MAX_POOL_CONNECTIONS: int = 10  # boto3 HTTP pool size and storage executor threads per worker
+    STORAGE_GC_INTERVAL: int = 6 * 3600  # seconds between orphaned-object sweeps of the bucket
+    STORAGE_GC_GRACE_HOURS: int = 24  # unreferenced objects younger than this are kept
+    UPLOAD_PRESIGN_EXPIRES: int = 600  # seconds a presigned direct upload stays valid
+    UPLOAD_MAX_IMAGE_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_FILE_BYTES: int = 25 * 1024 * 1024
+    IMAGE_PROCESS_WORKERS: int = 2  # processes per worker for decoding/resizing uploads
+    IMAGE_WEBP_QUALITY: int = 80
+    NOTIFICATION_UNREAD_COUNT_TTL: int = 3600  # seconds before the cached badge count is recomputed
+    NOTIFICATION_RETENTION_DAYS: int = 90  # read notifications older than this are archived
+    NOTIFICATION_ARCHIVE_INTERVAL: int = 3600  # seconds between archive runs
+    EVENT_COUNTER_FLUSH_INTERVAL: int = 10  # seconds between flushes of like/RSVP counters to Postgres
+    EVENT_COUNTER_RECONCILE_INTERVAL: int = 3600  # seconds between recounts of event counters from their source tables
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller bodies are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; low qualities are fast enough for per-request use
+    COMPRESSION_OFFLOAD_SIZE: int = 64 * 1024  # bodies at least this large are compressed on a worker thread
+    RFC_LANDING_CACHE_TTL: int = 300  # upper bound on staleness of the cached RFC page (author names/pictures)
+    NOTIFICATION_COALESCE_WINDOW_MINUTES: int = 60  # merge same-kind notifications about an event within this window
 
     class Config:
         env_file = ".env"
@@ -5,6 +5,7 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 import time
 from .config import settings
+from .metrics import InstrumentedRedis
 import redis
 # from urllib.parse import quote_plus
 
@@ -18,9 +19,30 @@ import redis
 SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}" #'postgresqu://<username>:<password>@<ip-adress of host/hostname>:<port>/<database_name>'
 # print(f"DEBUG: Connection string: {SQLALCHEMY_DATABASE_URL}")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Clients are created on first use instead of at import, so Alembic runs, scripts
+# and worker boot only pay for the clients they actually touch. The app's
+# lifespan closes them on shutdown.
+_engine = None
+_redis_client = None
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    return _engine
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to the engine when the first session is opened"""
+    
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
@@ -32,22 +54,55 @@ def get_db():
         db.close()
 
 
-# Create a Redis client - in production, these would come from settings
-redis_client = redis.Redis(
-    host=getattr(settings, 'REDIS_HOST', 'localhost'),
-    port=getattr(settings, 'REDIS_PORT', 6379),
-    db=getattr(settings, 'REDIS_DB', 0),
-    decode_responses=True  # This makes Redis return strings instead of bytes
-)
+def get_redis() -> redis.Redis:
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = InstrumentedRedis(
+            host=getattr(settings, 'REDIS_HOST', 'localhost'),
+            port=getattr(settings, 'REDIS_PORT', 6379),
+            db=getattr(settings, 'REDIS_DB', 0),
+            decode_responses=True  # This makes Redis return strings instead of bytes
+        )
+    return _redis_client
+
+
+class LazyScript:
+    """
+    Lua script registered against the Redis client on first call,
+    for modules that define their scripts at import time.
+    """
+    
+    def __init__(self, source: str):
+        self.source = source
+        self._script = None
+    
+    def __call__(self, keys=None, args=None):
+        client = get_redis()
+        if self._script is None:
+            self._script = client.register_script(self.source)
+        return self._script(keys=keys, args=args, client=client)
+
 
 # Test function to check Redis connection
 def ping_redis():
     try:
-        return redis_client.ping()
+        return get_redis().ping()
     except redis.ConnectionError:
         return False
 
 
+def close_clients():
+    """Release the DB pool and Redis connections (called on shutdown)"""
+    global _engine, _redis_client
+    if _redis_client is not None:
+        _redis_client.close()
+        _redis_client = None
+    if _engine is not None:
+        _engine.dispose()
+        SessionLocal.configure(bind=None)
+        _engine = None
+
+
 
 # while True:
 #     try:
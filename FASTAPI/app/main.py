@@ -1,15 +1,46 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import Body, FastAPI
-from . import models
-from .database import engine
-from .routers import post, user, auth, friendship, event, notification, invitation, chat, rfc
+from . import models, background, database
+from .services import image_service, storage_service
+from .routers import post, user, auth, friendship, event, notification, invitation, chat, rfc, upload, metrics, debug
 from pydantic_settings import BaseSettings
-from .config import Settings
+from .config import Settings, settings
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from .middleware.query_stats import QueryStatsMiddleware
+from .middleware.profiling import ProfilingMiddleware
+from .middleware.upload_limit import UploadLimitMiddleware
+from .middleware.etag import ETagMiddleware
+from .middleware.compression import CompressionMiddleware
+from .metrics import PrometheusMiddleware
 
 
-# models.Base.metadata.create_all(bind=engine)
+# models.Base.metadata.create_all(bind=database.get_engine())
 
-app = FastAPI() # FastAPI Instance is created allowing us to use the FastAPI methods
+# Neither uvicorn nor gunicorn configures the root logger, so records from
+# app.* loggers would only reach the last-resort handler (warnings and above)
+app_logger = logging.getLogger("app")
+if not app_logger.handlers:
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(logging.Formatter("%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s"))
+    app_logger.addHandler(log_handler)
+app_logger.setLevel(settings.LOG_LEVEL.upper())
+app_logger.propagate = False
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Periodic maintenance jobs (notification archival, ...) run inside every worker
+    jobs = background.start_periodic_jobs()
+    yield
+    for job in jobs:
+        job.cancel()
+    image_service.shutdown()
+    storage_service.shutdown()
+    database.close_clients()
+
+# orjson encodes responses (datetime/date/time natively) instead of the stdlib json module
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse) # FastAPI Instance is created allowing us to use the FastAPI methods
 
 origins = [
     "https://bone-social.com",
@@ -17,6 +48,17 @@ origins = [
     "http://localhost:3000",
 ] # list of origins that are allowed to access the backend
 
+# Innermost: a profiled request's replacement response passes through everything else
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Close to the handler, so only its own queries are counted for each request
+app.add_middleware(QueryStatsMiddleware)
+
+# Added before CORS so their 304/413/415 responses still carry CORS headers
+app.add_middleware(UploadLimitMiddleware)
+app.add_middleware(ETagMiddleware)
+
 app.add_middleware( #function that runs before the request is processed needed to allow the frontend to access the backend
     CORSMiddleware,
     allow_origins=origins,
@@ -25,6 +67,12 @@ app.add_middleware( #function that runs before the request is processed needed t
     allow_headers=["*"],
 )
 
+# Outside ETagMiddleware, so ETags are computed on the uncompressed body
+app.add_middleware(CompressionMiddleware)
+
+# Outermost, so request latency includes every other middleware
+app.add_middleware(PrometheusMiddleware)
+
 # app.include_router(post.router)
 app.include_router(user.router)
 app.include_router(auth.router)
@@ -34,6 +82,9 @@ app.include_router(notification.router)
 app.include_router(invitation.router)
 app.include_router(chat.router)
 app.include_router(rfc.router)
+app.include_router(upload.router)
+app.include_router(metrics.router)
+app.include_router(debug.router)
 
 @app.get("/")
 def root():
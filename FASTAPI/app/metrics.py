@@ -0,0 +1,200 @@
+# FASTAPI/app/metrics.py
+"""
+Prometheus metrics. Under gunicorn every worker is a separate process, so
+PROMETHEUS_MULTIPROC_DIR must point at a shared, empty directory before the
+workers start (see gunicorn.conf.py); /metrics then aggregates the files all
+workers write there. Gauges use the livesum mode so dead workers drop out.
+
+Without PROMETHEUS_MULTIPROC_DIR (plain `uvicorn app.main:app`, as in the
+docker-compose files) /metrics serves the in-process registry, which is only
+complete for a single process. Running uvicorn with --workers needs the same
+variable and directory as gunicorn.
+"""
+import os
+import time
+
+import redis
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+
+# ---- HTTP ----
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+
+# ---- Database ----
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Pooled DB connections currently checked out",
+    multiprocess_mode="livesum"
+)
+DB_POOL_OPEN = Gauge(
+    "db_pool_open_connections",
+    "DB connections currently open",
+    multiprocess_mode="livesum"
+)
+
+# ---- Redis ----
+
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command round-trip time",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+REDIS_COMMAND_ERRORS = Counter(
+    "redis_command_errors_total",
+    "Redis commands that raised",
+    ["command"]
+)
+
+# ---- Chat / WebSocket ----
+
+WEBSOCKET_CONNECTIONS = Gauge(
+    "chat_websocket_connections",
+    "Open chat WebSocket connections",
+    multiprocess_mode="livesum"
+)
+CHAT_QUEUE_DEPTH = Gauge(
+    "chat_queue_depth",
+    "Users waiting to be matched, by role",
+    ["role"],
+    multiprocess_mode="livesum"
+)
+CHAT_ACTIVE_SESSIONS = Gauge(
+    "chat_active_sessions",
+    "Running chat sessions",
+    multiprocess_mode="livesum"
+)
+
+# ---- Notifications ----
+
+NOTIFICATION_FANOUT = Histogram(
+    "notification_fanout_recipients",
+    "Recipients per notification fan-out",
+    ["kind"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+
+
+# The checked-out flag lives in record_info, which survives reconnects, so a
+# checkin that follows an invalidation or a failed checkout (no checkout event)
+# never decrements twice or below zero.
+_CHECKED_OUT_FLAG = "metrics_checked_out"
+
+
+def _release_checked_out(connection_record):
+    if connection_record is not None and connection_record.record_info.pop(_CHECKED_OUT_FLAG, False):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+@event.listens_for(Pool, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    DB_POOL_OPEN.inc()
+
+
+@event.listens_for(Pool, "close")
+def _on_close(dbapi_connection, connection_record):
+    # Also fired for hard invalidation and recycling
+    DB_POOL_OPEN.dec()
+
+
+@event.listens_for(Pool, "close_detached")
+def _on_close_detached(dbapi_connection):
+    DB_POOL_OPEN.dec()
+
+
+@event.listens_for(Pool, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.record_info[_CHECKED_OUT_FLAG] = True
+    DB_POOL_CHECKED_OUT.inc()
+
+
+@event.listens_for(Pool, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    _release_checked_out(connection_record)
+
+
+@event.listens_for(Pool, "detach")
+def _on_detach(dbapi_connection, connection_record):
+    # A detached connection leaves the pool without a checkin event
+    _release_checked_out(connection_record)
+
+
+class InstrumentedRedis(redis.Redis):
+    """redis.Redis that records the duration of every command it sends"""
+    
+    def execute_command(self, *args, **options):
+        command = str(args[0]).upper() if args else "UNKNOWN"
+        started_at = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        except redis.RedisError:
+            REDIS_COMMAND_ERRORS.labels(command=command).inc()
+            raise
+        finally:
+            REDIS_COMMAND_DURATION.labels(command=command).observe(time.perf_counter() - started_at)
+
+
+class PrometheusMiddleware:
+    """Records latency per route template and the number of in-flight requests"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # Label by template (/events/{id}), never the raw path, to bound cardinality
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            REQUEST_LATENCY.labels(method=method, route=route, status=str(status_code)).observe(
+                time.perf_counter() - started_at
+            )
+
+
+def render_metrics() -> bytes:
+    """Exposition text for /metrics, merged across workers in multiprocess mode"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,120 @@
+# FASTAPI/app/middleware/compression.py
+
+import gzip
+
+import anyio
+
+from ..config import settings
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (b"application/json", b"text/", b"image/svg+xml")
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str):
+    accepted = _accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    Brotli/gzip compression of JSON and text responses. Unlike Starlette's
+    GZipMiddleware it supports brotli and compresses bodies larger than
+    COMPRESSION_OFFLOAD_SIZE on a worker thread, so a big feed or overview
+    payload does not block the event loop. Bodies below
+    COMPRESSION_MINIMUM_SIZE and streamed responses are sent as they are.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding)
+        
+        start_message = None
+        
+        async def send_compressed(message):
+            nonlocal start_message
+            
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                content_type = headers.get(b"content-type", b"")
+                if not content_type.startswith(COMPRESSIBLE_TYPES) or b"content-encoding" in headers:
+                    await send(message)
+                    return
+                
+                # The body depends on Accept-Encoding even when it ends up uncompressed
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"vary", b"Accept-Encoding")]}
+                if encoding is None:
+                    await send(message)
+                    return
+                start_message = message
+                return
+            
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+            
+            held, start_message = start_message, None
+            body = message.get("body", b"")
+            
+            if message.get("more_body", False) or len(body) < settings.COMPRESSION_MINIMUM_SIZE:
+                await send(held)
+                await send(message)
+                return
+            
+            if len(body) >= settings.COMPRESSION_OFFLOAD_SIZE:
+                compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            
+            headers = [
+                (name, value) for name, value in held["headers"]
+                if name != b"content-length"
+            ]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+            ]
+            await send({**held, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+        
+        await self.app(scope, receive, send_compressed)
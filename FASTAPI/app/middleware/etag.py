@@ -0,0 +1,107 @@
+# FASTAPI/app/middleware/etag.py
+
+import hashlib
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+
+def _opaque_tags(header: str):
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in _opaque_tags(if_none_match)
+
+
+def check_not_modified(request: Request, *validator) -> str:
+    """
+    Conditional GET for handlers that can describe their payload cheaply,
+    e.g. by an updated_at column or version number. Raises a 304 when the
+    client already has this version, before the payload is built or
+    serialized; otherwise returns the ETag for the handler to send.
+    """
+    digest = hashlib.blake2b(repr(validator).encode(), digest_size=16).hexdigest()
+    etag = f'W/"{digest}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return etag
+
+
+class ETagMiddleware:
+    """
+    Adds a weak ETag derived from the body to successful GET responses with a
+    JSON body and answers If-None-Match with 304. Responses that already carry
+    an ETag (see check_not_modified) and streamed responses are left alone.
+    The 304 still costs the handler its work, but the client skips the download.
+    HEAD is passed through untagged: its body is empty, so a tag hashed from it
+    would not match the GET representation.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        
+        if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+                break
+        
+        start_message = None
+        
+        async def send_with_etag(message):
+            nonlocal start_message
+            
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                eligible = (
+                    message["status"] == 200
+                    and b"etag" not in headers
+                    and headers.get(b"content-type", b"").startswith(b"application/json")
+                )
+                if not eligible:
+                    await send(message)
+                    return
+                # Hold the start message until the body is known
+                start_message = message
+                return
+            
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+            
+            held, start_message = start_message, None
+            
+            if message.get("more_body", False):
+                # Streamed body: nothing to hash without buffering it all
+                await send(held)
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            
+            if etag_matches(if_none_match, etag):
+                headers = [
+                    (name, value) for name, value in held["headers"]
+                    if name not in (b"content-length", b"content-type")
+                ]
+                headers.append((b"etag", etag.encode()))
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            
+            await send({**held, "headers": list(held["headers"]) + [(b"etag", etag.encode())]})
+            await send(message)
+        
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,91 @@
+# FASTAPI/app/middleware/profiling.py
+
+import logging
+import secrets
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+
+from .. import oauth2
+from ..config import settings
+from ..profiler import SamplingProfiler, profile_lock
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+AUTHORIZATION_HEADER = b"authorization"
+
+
+class ProfilingMiddleware:
+    """
+    Per-request profiling: a request carrying `X-Profile: <PROFILING_TOKEN>`
+    from an admin (bearer token of a user in ADMIN_USER_IDS, as for
+    /debug/profile) runs normally under the sampling profiler, and its response
+    is replaced by the collapsed stacks. Every profiled request is logged. The original status is returned in X-Profiled-Status.
+    All threads of the worker are sampled, so on a busy worker concurrent
+    requests show up too.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    @staticmethod
+    def _admin_id(authorization: Optional[bytes]) -> Optional[int]:
+        scheme, _, token = (authorization or b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            token_data = oauth2.verify_access_token(token, HTTPException(status_code=401))
+        except HTTPException:
+            return None
+        user_id = int(token_data.id)
+        return user_id if user_id in settings.ADMIN_USER_IDS else None
+    
+    def _requested(self, scope) -> Optional[int]:
+        """The id of the admin asking for a profile, or None to serve the request normally"""
+        if scope["type"] != "http" or not settings.PROFILING_TOKEN:
+            return None
+        headers = dict(scope["headers"])
+        profile_token = headers.get(PROFILE_HEADER)
+        if profile_token is None or not secrets.compare_digest(profile_token, settings.PROFILING_TOKEN.encode()):
+            return None
+        return self._admin_id(headers.get(AUTHORIZATION_HEADER))
+    
+    async def __call__(self, scope, receive, send):
+        admin_id = self._requested(scope)
+        if admin_id is None or not profile_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        
+        logger.info("Profiling %s %s for admin %d", scope["method"], scope["path"], admin_id)
+        
+        profiled_status = None
+        
+        async def discard_response(message):
+            nonlocal profiled_status
+            if message["type"] == "http.response.start":
+                profiled_status = message["status"]
+        
+        profiler = SamplingProfiler()
+        started_at = time.perf_counter()
+        try:
+            profiler.start()
+            await self.app(scope, receive, discard_response)
+        finally:
+            profiler.stop()
+            profile_lock.release()
+        
+        body = profiler.collapsed().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profiled-status", str(profiled_status).encode()),
+                (b"x-profile-duration-ms", f"{(time.perf_counter() - started_at) * 1000:.1f}".encode()),
+                (b"x-profile-samples", str(profiler.samples).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,121 @@
+# FASTAPI/app/middleware/query_stats.py
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+from ..metrics import DB_QUERY_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Longest statement text written to the slow query log
+SLOW_QUERY_LOG_CHARS = 1000
+
+
+class QueryStats:
+    """SQL statements run and time spent in the database for one request"""
+    
+    def __init__(self, scope):
+        self.scope = scope
+        self.count = 0
+        self.db_time = 0.0
+    
+    @property
+    def endpoint(self) -> str:
+        # The route template once routing has happened, e.g. /events/{id}
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope["path"]
+        return f"{self.scope['method']} {path}"
+
+
+# Sync endpoints run on the threadpool with a copy of the request's context,
+# which still refers to the same QueryStats object
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = _current_stats.get()
+    
+    if stats is not None:
+        stats.count += 1
+        stats.db_time += elapsed
+    
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "slow_query duration_ms=%.1f endpoint=%r statement=%r",
+            elapsed * 1000,
+            stats.endpoint if stats is not None else None,
+            statement[:SLOW_QUERY_LOG_CHARS]
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+class QueryStatsMiddleware:
+    """
+    Counts SQL statements and database time per request. Every request is
+    logged with its totals; with DEBUG enabled the totals are also returned
+    as X-DB-Query-Count and X-DB-Time-Ms response headers.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = QueryStats(scope)
+        token = _current_stats.set(stats)
+        started_at = time.perf_counter()
+        status_code = None
+        
+        async def send_with_stats(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.DEBUG:
+                    message = {**message, "headers": list(message.get("headers", [])) + [
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-time-ms", f"{stats.db_time * 1000:.1f}".encode()),
+                    ]}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+            logger.info(
+                "request endpoint=%r status=%s duration_ms=%.1f db_queries=%d db_time_ms=%.1f",
+                stats.endpoint,
+                status_code,
+                (time.perf_counter() - started_at) * 1000,
+                stats.count,
+                stats.db_time * 1000,
+                extra={
+                    "endpoint": stats.endpoint,
+                    "status_code": status_code,
+                    "db_queries": stats.count,
+                    "db_time_ms": round(stats.db_time * 1000, 1),
+                }
+            )
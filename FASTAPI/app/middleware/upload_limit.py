@@ -0,0 +1,168 @@
+# FASTAPI/app/middleware/upload_limit.py
+
+import json
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional
+
+from ..config import settings
+
+
+@dataclass
+class UploadRule:
+    method: str
+    path: "re.Pattern"
+    max_bytes: int
+    images_only: bool = False
+
+
+# Matched against the end of the request path so a proxy prefix (/api) does not matter
+UPLOAD_RULES = [
+    UploadRule("POST", re.compile(r"/events/\d+/image$"), settings.UPLOAD_MAX_IMAGE_BYTES, images_only=True),
+    UploadRule("POST", re.compile(r"/users/me/picture$"), settings.UPLOAD_MAX_IMAGE_BYTES, images_only=True),
+    UploadRule("POST", re.compile(r"/events/upload/?$"), settings.UPLOAD_MAX_FILE_BYTES),
+]
+
+# How much of the body to buffer while looking for the file part's first bytes
+SNIFF_BUFFER_BYTES = 64 * 1024
+# Read-ahead bodies are kept in memory up to this size, then spooled to disk
+SPOOL_MEMORY_BYTES = 1024 * 1024
+# Size of the messages the read-ahead body is handed to the app in
+REPLAY_CHUNK_BYTES = 64 * 1024
+
+
+def looks_like_image(head: bytes) -> bool:
+    """Magic-number check for the image formats the pipeline accepts"""
+    return (
+        head.startswith(b"\xff\xd8\xff")  # JPEG
+        or head.startswith(b"\x89PNG\r\n\x1a\n")  # PNG
+        or head.startswith((b"GIF87a", b"GIF89a"))  # GIF
+        or (head[:4] == b"RIFF" and head[8:12] == b"WEBP")  # WebP
+    )
+
+
+def file_part_head(buffer: bytes) -> Optional[bytes]:
+    """
+    First bytes of the first multipart part that carries a filename,
+    or None if they have not arrived yet.
+    """
+    filename_at = buffer.find(b'filename="')
+    if filename_at == -1:
+        return None
+    headers_end = buffer.find(b"\r\n\r\n", filename_at)
+    if headers_end == -1 or len(buffer) < headers_end + 4 + 12:
+        return None
+    return buffer[headers_end + 4:headers_end + 4 + 12]
+
+
+class UploadLimitMiddleware:
+    """
+    Enforces per-endpoint upload limits before the app sees the request, so a
+    rejected upload never reaches python-multipart or the handler. Bodies with
+    a Content-Length over the limit are rejected with 413 straight away. Image
+    endpoints read ahead until the file part's first bytes have arrived and
+    answer 415 if they are not a known image format. Chunked bodies have no
+    declared length, so they are read (and spooled) in full and rejected with
+    413 as soon as they pass the limit. Whatever was read ahead is replayed to
+    the app before the rest of the body.
+    """
+    
+    def __init__(self, app, rules: List[UploadRule] = None):
+        self.app = app
+        self.rules = UPLOAD_RULES if rules is None else rules
+    
+    def _match(self, scope) -> Optional[UploadRule]:
+        for rule in self.rules:
+            if scope["method"] == rule.method and rule.path.search(scope["path"]):
+                return rule
+        return None
+    
+    @staticmethod
+    async def _send_error(send, status_code: int, detail: str):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        rule = self._match(scope)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+        
+        too_large = f"Upload exceeds the limit of {rule.max_bytes} bytes"
+        
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > rule.max_bytes:
+            await self._send_error(send, 413, too_large)
+            return
+        
+        # The server enforces a declared Content-Length, so only chunked bodies
+        # have to be counted
+        read_all = content_length is None
+        sniffing = rule.images_only
+        
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        try:
+            head = b""
+            buffered = 0
+            more_body = True
+            
+            while more_body and (read_all or sniffing):
+                message = await receive()
+                if message["type"] != "http.request":
+                    # The client went away before the app was started
+                    return
+                
+                chunk = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                buffered += len(chunk)
+                if buffered > rule.max_bytes:
+                    await self._send_error(send, 413, too_large)
+                    return
+                body.write(chunk)
+                
+                if sniffing:
+                    head += chunk[:SNIFF_BUFFER_BYTES + 1]
+                    part_head = file_part_head(head)
+                    if part_head is not None:
+                        if not looks_like_image(part_head):
+                            await self._send_error(send, 415, "Only JPEG, PNG, GIF or WebP images are accepted")
+                            return
+                        sniffing = False
+                    elif len(head) > SNIFF_BUFFER_BYTES or not more_body:
+                        # No file part found early on; leave validation to the handler
+                        sniffing = False
+            
+            body.seek(0)
+            # The final (empty) message was consumed while reading ahead
+            pending_end = not more_body
+            
+            async def replay_receive():
+                nonlocal pending_end
+                if body.tell() < buffered:
+                    chunk = body.read(REPLAY_CHUNK_BYTES)
+                    replayed_all = body.tell() >= buffered
+                    if replayed_all and not more_body:
+                        pending_end = False
+                    return {"type": "http.request", "body": chunk, "more_body": more_body or not replayed_all}
+                if pending_end:
+                    pending_end = False
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                return await receive()
+            
+            await self.app(scope, replay_receive, send)
+        finally:
+            body.close()
@@ -1,10 +1,10 @@
 from .database import Base
-from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, ForeignKey, UniqueConstraint, Date, Time, Enum, JSON
+from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, ForeignKey, UniqueConstraint, Date, Time, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.expression import text
 from datetime import datetime
 from enum import Enum as PyEnum
-from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.dialects.postgresql import ARRAY, ENUM
 
 # Enums for controlled vocabularies
 event_visibility = ENUM('PUBLIC', 'PRIVATE', 'FRIENDS', name='event_visibility', create_type=False)
@@ -119,6 +119,7 @@ class Event(Base):
     guest_limit      = Column(Integer, nullable=True)
     interested_count = Column(Integer, nullable=False, server_default='0')
     going_count      = Column(Integer, nullable=False, server_default='0')
+    like_count       = Column(Integer, nullable=False, server_default='0')  # flushed from Redis, see EventCounterService
 
     # Audit
     created_at       = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
@@ -158,8 +159,41 @@ class Notification(Base):
     is_read = Column(Boolean, server_default="False", nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
     
+    # Coalescing: unread notifications of the same kind about the same event are merged
+    kind = Column(String, nullable=True)  # e.g. "event_match"
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=True)
+    actor_count = Column(Integer, nullable=False, server_default="1")
+    actor_ids = Column(ARRAY(Integer), nullable=False, server_default="{}")  # distinct users behind actor_count
+    
     # Define relationship
     user = relationship("User")
+    
+    __table_args__ = (
+        # Inbox keyset pagination: newest first per user
+        Index('ix_notifications_user_created', 'user_id', 'created_at', 'id'),
+        # Retention job: read notifications by age
+        Index('ix_notifications_read_created', 'created_at', postgresql_where=text('is_read')),
+        # At most one open notification per (user, kind, event); coalescing upserts against it
+        Index('ix_notifications_coalesce', 'user_id', 'kind', 'event_id', unique=True, postgresql_where=text('NOT is_read')),
+    )
+
+class NotificationArchive(Base):
+    """Cold storage for read notifications moved out of the inbox table"""
+    __tablename__ = "notifications_archive"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False, nullable=False)  # Original notification id
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    content = Column(String, nullable=False)
+    is_read = Column(Boolean, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    kind = Column(String, nullable=True)
+    event_id = Column(Integer, nullable=True)  # No FK: archived rows outlive their events
+    actor_count = Column(Integer, nullable=False, server_default="1")
+    archived_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
+    
+    __table_args__ = (
+        Index('ix_notifications_archive_user_created', 'user_id', 'created_at'),
+    )
 
 class RSVP(Base):
     __tablename__ = 'rsvps'
@@ -175,6 +209,19 @@ class RSVP(Base):
     user         = relationship('User', back_populates='rsvps')
     event        = relationship('Event', back_populates='event_rsvps')
 
+class EventWaitlist(Base):
+    __tablename__ = 'event_waitlist'
+    __table_args__ = (
+        Index('ix_event_waitlist_event_joined', 'event_id', 'joined_at'),
+    )
+
+    event_id     = Column(Integer, ForeignKey('events.id', ondelete='CASCADE'), primary_key=True)
+    user_id      = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    joined_at    = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+
+    user         = relationship('User')
+    event        = relationship('Event')
+
 class Match(Base):
     __tablename__ = 'matches'
 
@@ -261,10 +308,14 @@ class FeatureVote(Base):
     __tablename__ = 'feature_votes'
     __table_args__ = (
         UniqueConstraint('user_id', 'feature_id', name='uc_feature_vote_user_feature'),
+        # Each vote occupies one of the user's numbered vote slots, so the vote
+        # limit is enforced by this constraint rather than a COUNT
+        UniqueConstraint('user_id', 'slot', name='uc_feature_vote_user_slot'),
     )
 
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
     feature_id = Column(Integer, ForeignKey('features.id', ondelete='CASCADE'), primary_key=True)
+    slot = Column(Integer, nullable=False)
     voted_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
 
     user = relationship('User', back_populates='feature_votes')
@@ -273,6 +324,10 @@ class FeatureVote(Base):
 # Comment System Models
 class Comment(Base):
     __tablename__ = 'comments'
+    __table_args__ = (
+        # Newest-first keyset pagination
+        Index('ix_comments_created_id', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     content = Column(String, nullable=False)
@@ -291,6 +346,10 @@ class Comment(Base):
 
 class CommentReply(Base):
     __tablename__ = 'comment_replies'
+    __table_args__ = (
+        # Reply previews and "load more replies" per comment
+        Index('ix_comment_replies_comment_created_id', 'comment_id', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     content = Column(String, nullable=False)
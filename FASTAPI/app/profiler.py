@@ -0,0 +1,69 @@
+# FASTAPI/app/profiler.py
+"""
+Low-overhead sampling profiler for a running worker. A daemon thread wakes up
+every `interval` seconds, snapshots every thread's Python stack with
+sys._current_frames() and counts identical stacks. Nothing is traced, so the
+profiled code runs at full speed between samples. The result is in the
+collapsed-stack format read by flamegraph.pl, speedscope and inferno.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+
+DEFAULT_INTERVAL = 0.005  # seconds between samples
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    # ';' separates frames in the collapsed format
+    name = getattr(code, "co_qualname", code.co_name).replace(";", ":")
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, str(thread_id)).replace(";", ":"))
+            self.stacks[";".join(reversed(labels))] += 1
+        self.samples += 1
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def collapsed(self) -> str:
+        """One 'frame;frame;frame count' line per distinct stack, root first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# One profile at a time per worker; overlapping runs would sample each other
+profile_lock = threading.Lock()
@@ -0,0 +1,55 @@
+# FASTAPI/app/routers/debug.py
+import asyncio
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from .. import models, oauth2
+from ..config import settings
+from ..profiler import SamplingProfiler, profile_lock
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"]
+)
+
+def get_profiling_admin(current_user: models.User = Depends(oauth2.get_current_user)) -> models.User:
+    # Hidden entirely unless profiling is switched on for this deployment
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if current_user.id not in settings.ADMIN_USER_IDS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
+    return current_user
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=60),
+    current_user: models.User = Depends(get_profiling_admin)
+):
+    """
+    Sample every thread of the worker that serves this request for the given
+    number of seconds and return the collapsed stacks
+    (flamegraph.pl / speedscope input). Other workers are not affected.
+    """
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running on this worker"
+        )
+    
+    profiler = SamplingProfiler()
+    try:
+        profiler.start()
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+        profile_lock.release()
+    
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{os.getpid()}.collapsed"',
+            "X-Profile-Samples": str(profiler.samples),
+        }
+    )
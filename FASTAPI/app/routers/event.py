@@ -1,15 +1,18 @@
 # Create a new file: FASTAPI/app/routers/event.py
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Response, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response, UploadFile, File, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict
 from datetime import datetime
 from .. import models, schemas, oauth2
 from ..database import get_db
+from ..middleware.etag import check_not_modified
 from ..services.notification_service import NotificationService
+from ..services.event_counter_service import EventCounterService
+from ..services.rsvp_service import RSVPService, EventFullError
 from sqlalchemy import and_, func, or_
-import uuid
-from ..services import storage_service
+from ..services import storage_service, image_service
 import jwt
 from ..config import settings
 
@@ -112,6 +115,8 @@ def create_event(
         db.add(creator_like)
         db.commit()
         
+        EventCounterService.increment(db, new_event.id, {"like_count": 1})
+        
         # Note: No need to call NotificationService.notify_event_match here
         # since it's the creator liking their own event
     
@@ -134,29 +139,25 @@ async def upload_event_image(
             detail=f"Event with id {event_id} not found"
         )
     
-    # Generate a unique filename
-    original_filename = file.filename
-    file_extension = original_filename.split(".")[-1] if "." in original_filename else "jpg"
-    object_name = f"event-images/{event_id}/{uuid.uuid4()}.{file_extension}"
-    
     try:
-        # Reset the file pointer to the beginning
-        file.file.seek(0)
-        # Upload the file to storage service
-        storage_service.upload_fileobj(file.file, object_name)
+        # Resize/re-encode in the process pool and upload every rendition,
+        # unless identical bytes are already stored
+        file_url = await image_service.store_image_deduplicated(await file.read())
         
-        # Get the public URL
-        file_url = storage_service.generate_file_url(object_name)
-        
-        # Update the event's image URL
+        # Update the event's cover photo URL
         db.query(models.Event).filter(models.Event.id == event_id).update(
-            {"image_url": file_url},
+            {"cover_photo_url": file_url},
             synchronize_session=False
         )
         db.commit()
         
         # Return the updated event
         return db.query(models.Event).filter(models.Event.id == event_id).first()
+    except image_service.InvalidImageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -168,21 +169,33 @@ async def upload_file_endpoint(file: UploadFile = File(...), db: Session = Depen
     """
     Endpoint for uploading a file.
     
-    - Generates a unique filename using UUID.
+    - Images go through the image pipeline (resized renditions, deduplicated).
+    - Other files are named after the SHA-256 of their content.
+    - Skips the upload if that object is already stored.
     - Uses the storage service to upload the file directly to DigitalOcean Spaces.
     - Returns the public URL of the uploaded file.
     """
-    # Generate a unique filename to avoid conflicts.
-    # Keep the original file extension.
-    original_filename = file.filename
-    file_extension = original_filename.split(".")[-1] if "." in original_filename else "dat"
-    object_name = f"{uuid.uuid4()}.{file_extension}"
+    # The web client uploads cover photos here before creating the event
+    if file.content_type and file.content_type.startswith("image/"):
+        try:
+            file_url = await image_service.store_image_deduplicated(await file.read())
+        except image_service.InvalidImageError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Upload failed: {e}")
+        return {"file_url": file_url}
+    
+    # Content-addressed filename: identical files share one object.
+    # Keep the original file extension; it alone decides the served Content-Type.
+    file_extension = storage_service.safe_extension(file.filename)
 
     try:
-        # Reset the file pointer to the beginning, if needed.
-        file.file.seek(0)
-        # Upload the file using the storage service
-        storage_service.upload_fileobj(file.file, object_name)
+        digest = await storage_service.hash_upload(file)
+        object_name = storage_service.content_key("uploads", digest, file_extension)
+        
+        if not await storage_service.stored_object_exists_async(object_name):
+            # Upload the file using the storage service without blocking the event loop
+            await storage_service.upload_fileobj_async(file.file, object_name)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {e}")
 
@@ -297,7 +310,7 @@ def get_events(
             creator_info = {
                 "id": creator.id,
                 "username": creator.username,
-                "profile_picture": creator.profile_picture
+                "profile_picture": storage_service.rendition_url(creator.profile_picture, "thumbnail")
             }
         
         # Create result dictionary with event and additional fields
@@ -311,12 +324,13 @@ def get_events(
             "start_time": event.start_time,
             "end_time": event.end_time,
             "location": event.location,  # Fixed: use 'location' not 'place'
-            "cover_photo_url": event.cover_photo_url,  # Fixed: use 'cover_photo_url' not 'image_url'
+            "cover_photo_url": storage_service.rendition_url(event.cover_photo_url, "card"),  # Feed cards use the card rendition
             "guest_limit": event.guest_limit,
             "rsvp_close_time": event.rsvp_close_time,
             "visibility": event.visibility,
             "interested_count": event.interested_count,
             "going_count": event.going_count,
+            "like_count": event.like_count,
             "status": event.status,
             "created_at": event.created_at,
             "updated_at": event.updated_at,
@@ -407,12 +421,13 @@ def get_user_own_events(
             "start_time": event.start_time,
             "end_time": event.end_time,
             "location": event.location,
-            "cover_photo_url": event.cover_photo_url,
+            "cover_photo_url": storage_service.rendition_url(event.cover_photo_url, "card"),
             "guest_limit": event.guest_limit,
             "rsvp_close_time": event.rsvp_close_time,
             "visibility": event.visibility,
             "interested_count": event.interested_count,
             "going_count": event.going_count,
+            "like_count": event.like_count,
             "status": event.status,
             "created_at": event.created_at,
             "updated_at": event.updated_at,
@@ -556,7 +571,7 @@ def get_user_matches(
             if current_user_rsvp:
                 current_rsvp_data = {
                     "status": current_user_rsvp.status,
-                    "responded_at": current_user_rsvp.responded_at.isoformat() if current_user_rsvp.responded_at else None
+                    "responded_at": current_user_rsvp.responded_at
                 }
             
             # Creator info
@@ -568,26 +583,27 @@ def get_user_matches(
                     "profile_picture": creator_profile_picture
                 }
             
-            # Convert SQLAlchemy model to dict with correct field mapping and handle datetime serialization
+            # Convert SQLAlchemy model to dict with correct field mapping (orjson encodes dates and times natively)
             event_dict = {
                 "id": event.id,
                 "title": event.title,
                 "description": event.description,
-                "start_date": event.start_date.isoformat() if event.start_date else None,
-                "end_date": event.end_date.isoformat() if event.end_date else None,
-                "start_time": str(event.start_time) if event.start_time else None,
-                "end_time": str(event.end_time) if event.end_time else None,
+                "start_date": event.start_date,
+                "end_date": event.end_date,
+                "start_time": event.start_time,
+                "end_time": event.end_time,
                 "location": event.location,
-                "cover_photo_url": event.cover_photo_url,
+                "cover_photo_url": storage_service.rendition_url(event.cover_photo_url, "card"),
                 "guest_limit": event.guest_limit,
-                "rsvp_close_time": event.rsvp_close_time.isoformat() if event.rsvp_close_time else None,
+                "rsvp_close_time": event.rsvp_close_time,
                 "visibility": event.visibility,
                 "interested_count": event.interested_count,
                 "going_count": event.going_count,
+                "like_count": event.like_count,
                 "status": event.status,
-                "created_at": event.created_at.isoformat() if event.created_at else None,
-                "updated_at": event.updated_at.isoformat() if event.updated_at else None,
-                "last_edited_at": event.last_edited_at.isoformat() if event.last_edited_at else None,
+                "created_at": event.created_at,
+                "updated_at": event.updated_at,
+                "last_edited_at": event.last_edited_at,
                 "creator_id": event.creator_id,
                 "liked_by_current_user": user_liked,
                 "liked_by_friends": all_liked_users,  # FIXED: Now includes current user
@@ -597,7 +613,8 @@ def get_user_matches(
             
             result.append(event_dict)
         
-        return result
+        # Returned as a response so FastAPI skips the jsonable_encoder pass
+        return ORJSONResponse(result)
         
     except Exception as e:
         # For debugging - log the actual error
@@ -688,6 +705,8 @@ def get_event_detail(
 @router.get("/{id}", response_model=schemas.EventResponse)
 def get_event(
     id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(oauth2.get_current_user)
 ):
@@ -699,6 +718,12 @@ def get_event(
             detail=f"Event with id {id} not found"
         )
     
+    # Counters are updated with plain SQL and do not touch updated_at
+    response.headers["ETag"] = check_not_modified(
+        request, "event", event.id, event.updated_at,
+        event.like_count, event.interested_count, event.going_count
+    )
+    
     return event
 
 @router.post("/{id}/like", status_code=status.HTTP_201_CREATED)
@@ -738,6 +763,8 @@ def like_event(
     db.add(new_like)
     db.commit()
     
+    EventCounterService.increment(db, id, {"like_count": 1})
+    
     # Get user's friends who have also liked this event
     friends_who_liked = get_friends_who_liked_event(db, current_user.id, id)
     
@@ -878,10 +905,13 @@ def unlike_event(
             detail=f"Cannot unlike event while you have an active RSVP. Please cancel your RSVP first (current status: {active_rsvp.status})"
         )
     
-    # Delete the like
-    like_query.delete(synchronize_session=False)
+    # Delete the like; a concurrent unlike may have removed it already
+    deleted = like_query.delete(synchronize_session=False)
     db.commit()
     
+    if deleted:
+        EventCounterService.increment(db, id, {"like_count": -1})
+    
     # Clean up any matches when user unlikes an event
     from ..services.match_service import MatchService
     
@@ -900,63 +930,36 @@ def rsvp_to_event(
 ):
     """RSVP to an event (GOING or CANCELLED only)"""
     
-    # Check if event exists
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
-    if not event:
+    # Check the event exists and that the user has liked it first
+    user_liked = RSVPService.get_event_like_state(db, current_user.id, event_id)
+    
+    if user_liked is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Event with id {event_id} not found"
         )
     
-    # UPDATED: Validate that user has liked the event first
-    user_like = db.query(models.EventLike).filter(
-        and_(
-            models.EventLike.user_id == current_user.id,
-            models.EventLike.event_id == event_id
-        )
-    ).first()
-    
-    if not user_like:
+    if not user_liked:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You must like an event before you can RSVP to it"
         )
     
-    # Check if user already has an RSVP for this event
-    existing_rsvp = db.query(models.RSVP).filter(
-        and_(
-            models.RSVP.user_id == current_user.id,
-            models.RSVP.event_id == event_id
+    # Upsert the RSVP and adjust the event counts in one transaction
+    try:
+        rsvp = RSVPService.upsert_rsvp(db, current_user.id, event_id, rsvp_data.status)
+    except EventFullError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This event has reached its guest limit. You can join the waitlist instead"
         )
-    ).first()
     
-    if existing_rsvp:
-        # Update existing RSVP
-        existing_rsvp.status = rsvp_data.status
-        existing_rsvp.responded_at = datetime.utcnow()
-        db.commit()
-        db.refresh(existing_rsvp)
-        
-        # Update event counts
-        update_event_rsvp_counts(db, event_id)
-        
-        return existing_rsvp
-    else:
-        # Create new RSVP
-        new_rsvp = models.RSVP(
-            user_id=current_user.id,
-            event_id=event_id,
-            status=rsvp_data.status
-        )
-        
-        db.add(new_rsvp)
-        db.commit()
-        db.refresh(new_rsvp)
-        
-        # Update event counts
-        update_event_rsvp_counts(db, event_id)
-        
-        return new_rsvp
+    return {
+        "user_id": rsvp.user_id,
+        "event_id": rsvp.event_id,
+        "status": rsvp.status,
+        "responded_at": rsvp.responded_at
+    }
 
 @router.delete("/{event_id}/rsvp", status_code=status.HTTP_204_NO_CONTENT)
 def cancel_rsvp(
@@ -966,28 +969,85 @@ def cancel_rsvp(
 ):
     """Cancel/remove RSVP for an event"""
     
-    # Find existing RSVP
-    rsvp = db.query(models.RSVP).filter(
+    # Delete the RSVP and update event counts in one transaction
+    removed_status = RSVPService.delete_rsvp(db, current_user.id, event_id)
+    
+    if removed_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="RSVP not found"
+        )
+    
+    return
+
+@router.post("/{event_id}/waitlist", response_model=schemas.WaitlistResponse, status_code=status.HTTP_201_CREATED)
+def join_event_waitlist(
+    event_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    """Join the waitlist of a full event; the first in line is moved to GOING when a spot frees up"""
+    
+    # Check the event exists and that the user has liked it first
+    user_liked = RSVPService.get_event_like_state(db, current_user.id, event_id)
+    
+    if user_liked is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Event with id {event_id} not found"
+        )
+    
+    if not user_liked:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You must like an event before you can join its waitlist"
+        )
+    
+    going = db.query(models.RSVP).filter(
         and_(
             models.RSVP.user_id == current_user.id,
-            models.RSVP.event_id == event_id
+            models.RSVP.event_id == event_id,
+            models.RSVP.status == 'GOING'
         )
     ).first()
     
-    if not rsvp:
+    if going:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="RSVP not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You are already going to this event"
         )
     
-    # Delete the RSVP
-    db.delete(rsvp)
-    db.commit()
+    waitlist_entry = RSVPService.join_waitlist(db, current_user.id, event_id)
     
-    # Update event counts
-    update_event_rsvp_counts(db, event_id)
+    if waitlist_entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This event still has free spots. RSVP instead"
+        )
     
-    return
+    joined_at, position = waitlist_entry
+    return {
+        "event_id": event_id,
+        "user_id": current_user.id,
+        "joined_at": joined_at,
+        "position": position
+    }
+
+@router.delete("/{event_id}/waitlist", status_code=status.HTTP_204_NO_CONTENT)
+def leave_event_waitlist(
+    event_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    """Leave the waitlist of an event"""
+    
+    if not RSVPService.leave_waitlist(db, current_user.id, event_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="You are not on the waitlist for this event"
+        )
+    
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.get("/{event_id}/rsvps", response_model=List[schemas.UserWithRSVP])
 def get_event_rsvps(
@@ -1038,34 +1098,6 @@ def get_event_rsvps(
     
     return users_with_rsvp
 
-def update_event_rsvp_counts(db: Session, event_id: int):
-    """Helper function to update event RSVP counts"""
-    
-    # Count interested users
-    interested_count = db.query(models.RSVP).filter(
-        and_(
-            models.RSVP.event_id == event_id,
-            models.RSVP.status == 'INTERESTED'
-        )
-    ).count()
-    
-    # Count going users
-    going_count = db.query(models.RSVP).filter(
-        and_(
-            models.RSVP.event_id == event_id,
-            models.RSVP.status == 'GOING'
-        )
-    ).count()
-    
-    # Update event counts
-    db.query(models.Event).filter(models.Event.id == event_id).update({
-        'interested_count': interested_count,
-        'going_count': going_count
-    })
-    
-    db.commit()
-
-
 @router.get("/{event_id}/chat-info")
 def get_event_chat_info(
     event_id: int,
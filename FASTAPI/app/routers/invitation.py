@@ -1,11 +1,12 @@
 # FASTAPI/app/routers/invitation.py
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query, Header
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from ..services.qrcode_service import QRCodeService
+from typing import List, Literal, Optional
+from ..services.qrcode_service import QRCodeService, MEDIA_TYPES
 
 from .. import models, schemas, oauth2
 from ..database import get_db
+from ..middleware.etag import etag_matches
 from ..services.invitation_service import InvitationService
 
 router = APIRouter(
@@ -40,30 +41,38 @@ def get_invitation_qrcode(
     token_id: int,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(oauth2.get_current_user),
-    size: int = 10
+    size: int = Query(10, ge=1, le=40),
+    fmt: Literal["png", "svg"] = Query("png", alias="format"),
+    if_none_match: Optional[str] = Header(None)
 ):
-    # Get the token with proper error handling
-    invitation = db.query(models.InvitationToken).filter(models.InvitationToken.id == token_id).first()
+    """
+    QR code linking to the signup page for an invitation token.
+    Renders are cached and carry a strong ETag, so repeat views are answered
+    with 304 without rendering anything.
+    """
+    token = db.query(models.InvitationToken.token).filter(models.InvitationToken.id == token_id).scalar()
     
-    if not invitation:
+    if not token:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail=f"Invitation token with ID {token_id} not found"
         )
     
-    # Add logging to debug
-    print(f"Found invitation token: {invitation.token} for ID: {token_id}")
-    
     # Get your frontend URL from settings
     frontend_url = "https://bone-social.com"  # You can also use settings.FRONTEND_URL if configured
     
     # Create URL for registration with this token
-    registration_url = f"{frontend_url}/signup/{invitation.token}"
+    registration_url = f"{frontend_url}/signup/{token}"
+    
+    etag = QRCodeService.etag(registration_url, size, fmt)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
     # Generate QR code
-    qr_code = QRCodeService.generate_qr_code(registration_url, size)
+    qr_code = QRCodeService.generate_qr_code(registration_url, size, fmt)
     
-    return Response(content=qr_code, media_type="image/png")
+    return Response(content=qr_code, media_type=MEDIA_TYPES[fmt], headers=headers)
 
 
 # Add to FASTAPI/app/routers/invitation.py
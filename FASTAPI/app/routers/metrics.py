@@ -0,0 +1,27 @@
+# FASTAPI/app/routers/metrics.py
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Response, status
+
+from ..config import settings
+from ..metrics import CONTENT_TYPE_LATEST, render_metrics
+
+# The app port is published, so the endpoint is not protected by the proxy
+# alone: scrapes must carry `Authorization: Bearer <METRICS_TOKEN>`
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(authorization: Optional[str] = Header(None)):
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from .. import models, schemas, oauth2
 from ..database import get_db
-from ..services.notification_service import NotificationService
+from ..services.notification_service import NotificationService, InvalidCursorError
 
 router = APIRouter(
     prefix="/notifications",
@@ -18,17 +18,59 @@ def get_notifications(
     current_user: models.User = Depends(oauth2.get_current_user),
     limit: int = 20,
     skip: int = 0,
-    unread_only: bool = False
+    unread_only: bool = False,
+    before_id: Optional[int] = None
 ):
-    notifications = NotificationService.get_user_notifications(
+    try:
+        notifications = NotificationService.get_user_notifications(
+            db=db,
+            user_id=current_user.id,
+            limit=limit,
+            skip=skip,
+            unread_only=unread_only,
+            before_id=before_id
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return notifications
+
+@router.get("/unread-count", response_model=schemas.NotificationUnreadCount)
+def get_unread_notification_count(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    """Get the unread notification count for the badge without loading notifications"""
+    unread_count = NotificationService.get_unread_count(db=db, user_id=current_user.id)
+    
+    return {"unread_count": unread_count}
+
+@router.post("/read", response_model=schemas.NotificationBulkReadResult)
+def mark_notifications_as_read(
+    read_request: schemas.NotificationBulkRead,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    """Mark several notifications as read, by ID list and/or an id/timestamp watermark"""
+    updated = NotificationService.mark_many_as_read(
         db=db,
         user_id=current_user.id,
-        limit=limit,
-        skip=skip,
-        unread_only=unread_only
+        ids=read_request.ids,
+        up_to_id=read_request.up_to_id,
+        up_to=read_request.up_to
     )
     
-    return notifications
+    return {"updated": updated}
+
+@router.post("/read-all", response_model=schemas.NotificationBulkReadResult)
+def mark_all_notifications_as_read(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    """Mark every unread notification of the current user as read"""
+    updated = NotificationService.mark_many_as_read(db=db, user_id=current_user.id)
+    
+    return {"updated": updated}
 
 @router.api_route("/{id}/read", methods=["PATCH", "POST"], response_model=schemas.Notification)
 def mark_notification_as_read(
@@ -1,51 +1,82 @@
 # Create new file: FASTAPI/app/routers/rfc.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc, and_
-from typing import List
+from sqlalchemy import func, desc, and_, tuple_
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import TypeAdapter
 from .. import models, schemas, oauth2
 from ..database import get_db
+from ..middleware.etag import check_not_modified
+from ..services.rfc_cache_service import RFCCacheService
+from ..services.rfc_service import RFCService, AlreadyVotedError, VoteLimitError
 
 router = APIRouter(
     prefix="/rfc",
     tags=["request-for-comment"]
 )
 
+_DATETIME = TypeAdapter(datetime)
+
+def _json_datetime(value: Optional[datetime]) -> Optional[str]:
+    """A datetime formatted exactly as pydantic serializes it in response models"""
+    return None if value is None else _DATETIME.dump_python(value, mode="json")
+
+def _trusted_response(content, headers: Optional[dict] = None) -> ORJSONResponse:
+    """
+    Content built in this module from ORM rows already is the response_model's
+    JSON form: the dict builders below emit exactly the schema's fields, in
+    the schema's order, with datetimes pre-formatted by _json_datetime. It is
+    encoded directly instead of being validated into schema objects and then
+    serialized by FastAPI; tests/test_rfc_responses.py checks the bytes match.
+    response_model stays on the routes for the OpenAPI docs.
+    """
+    return ORJSONResponse(content, headers=headers)
+
 # ============= FEATURE WISHLIST ENDPOINTS =============
 
+def _feature_dict(feature: models.Feature, user_voted_feature_ids) -> dict:
+    return {
+        "title": feature.title,
+        "description": feature.description,
+        "id": feature.id,
+        "vote_count": feature.vote_count,
+        "created_at": _json_datetime(feature.created_at),
+        "updated_at": _json_datetime(feature.updated_at),
+        "created_by": feature.created_by,
+        "user_has_voted": feature.id in user_voted_feature_ids
+    }
+
 @router.get("/features", response_model=List[schemas.FeatureResponse])
 def get_features(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(oauth2.get_current_user)
 ):
     """Get all features sorted by vote count (most voted first)"""
     
-    # Get all features with vote counts
-    features = db.query(models.Feature).order_by(desc(models.Feature.vote_count)).all()
-    
     # Get user's current votes to mark which features they've voted for
     user_votes = db.query(models.FeatureVote.feature_id).filter(
         models.FeatureVote.user_id == current_user.id
     ).all()
     user_voted_feature_ids = {vote[0] for vote in user_votes}
     
-    # Build response with user voting status
-    feature_responses = []
-    for feature in features:
-        feature_dict = {
-            "id": feature.id,
-            "title": feature.title,
-            "description": feature.description,
-            "vote_count": feature.vote_count,
-            "created_at": feature.created_at,
-            "updated_at": feature.updated_at,
-            "created_by": feature.created_by,
-            "user_has_voted": feature.id in user_voted_feature_ids
-        }
-        feature_responses.append(schemas.FeatureResponse(**feature_dict))
+    # Every vote or new feature replaces the RFC data version, so it plus the
+    # user's own votes identify the payload without loading the features
+    headers = {}
+    version = RFCCacheService.current_version()
+    if version is not None:
+        headers["ETag"] = check_not_modified(request, "rfc-features", version, sorted(user_voted_feature_ids))
     
-    return feature_responses
+    # Get all features with vote counts
+    features = db.query(models.Feature).order_by(desc(models.Feature.vote_count)).all()
+    
+    return _trusted_response(
+        [_feature_dict(feature, user_voted_feature_ids) for feature in features],
+        headers=headers
+    )
 
 @router.get("/features/user-votes", response_model=schemas.UserVoteSummary)
 def get_user_vote_summary(
@@ -77,52 +108,26 @@ def vote_for_feature(
 ):
     """Vote for a feature (max 2 votes per user)"""
     
-    # Check if feature exists
-    feature = db.query(models.Feature).filter(models.Feature.id == feature_id).first()
-    if not feature:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Feature with id {feature_id} not found"
-        )
-    
-    # Check if user already voted for this feature
-    existing_vote = db.query(models.FeatureVote).filter(
-        and_(
-            models.FeatureVote.user_id == current_user.id,
-            models.FeatureVote.feature_id == feature_id
-        )
-    ).first()
-    
-    if existing_vote:
+    try:
+        new_vote = RFCService.cast_vote(db, current_user.id, feature_id)
+    except AlreadyVotedError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You have already voted for this feature"
         )
-    
-    # Check if user has reached vote limit (2 votes)
-    user_vote_count = db.query(models.FeatureVote).filter(
-        models.FeatureVote.user_id == current_user.id
-    ).count()
-    
-    if user_vote_count >= 2:
+    except VoteLimitError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You have reached the maximum number of votes (2)"
+            detail=f"You have reached the maximum number of votes ({RFCService.VOTE_LIMIT})"
         )
     
-    # Create the vote
-    new_vote = models.FeatureVote(
-        user_id=current_user.id,
-        feature_id=feature_id
-    )
-    
-    db.add(new_vote)
-    
-    # Update feature vote count
-    feature.vote_count += 1
+    if new_vote is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Feature with id {feature_id} not found"
+        )
     
-    db.commit()
-    db.refresh(new_vote)
+    RFCCacheService.invalidate()
     
     return new_vote
 
@@ -134,28 +139,13 @@ def remove_vote_from_feature(
 ):
     """Remove vote from a feature"""
     
-    # Find the vote
-    vote = db.query(models.FeatureVote).filter(
-        and_(
-            models.FeatureVote.user_id == current_user.id,
-            models.FeatureVote.feature_id == feature_id
-        )
-    ).first()
-    
-    if not vote:
+    if not RFCService.remove_vote(db, current_user.id, feature_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vote not found"
         )
     
-    # Get the feature and decrease vote count
-    feature = db.query(models.Feature).filter(models.Feature.id == feature_id).first()
-    if feature:
-        feature.vote_count = max(0, feature.vote_count - 1)
-    
-    # Delete the vote
-    db.delete(vote)
-    db.commit()
+    RFCCacheService.invalidate()
     
     return {"message": "Vote removed successfully"}
 
@@ -177,96 +167,200 @@ def create_feature(
     db.commit()
     db.refresh(new_feature)
     
-    # Convert to response format
-    feature_dict = {
-        "id": new_feature.id,
-        "title": new_feature.title,
-        "description": new_feature.description,
-        "vote_count": new_feature.vote_count,
-        "created_at": new_feature.created_at,
-        "updated_at": new_feature.updated_at,
-        "created_by": new_feature.created_by,
-        "user_has_voted": False  # Creator hasn't voted yet
-    }
+    RFCCacheService.invalidate()
     
-    return schemas.FeatureResponse(**feature_dict)
+    # Convert to response format (creator hasn't voted yet)
+    return schemas.FeatureResponse(**_feature_dict(new_feature, ()))
 
 # ============= COMMENT SYSTEM ENDPOINTS =============
 
+# Replies returned inline with each comment; the rest come from GET /comments/{id}/replies
+INLINE_REPLY_LIMIT = 3
+
+def _author_dict(author: models.User) -> dict:
+    return {
+        "id": author.id,
+        "username": author.username,
+        "profile_picture": author.profile_picture
+    }
+
+def _reply_dict(reply: models.CommentReply, user_liked_reply_ids) -> dict:
+    return {
+        "content": reply.content,
+        "id": reply.id,
+        "comment_id": reply.comment_id,
+        "author_id": reply.author_id,
+        "like_count": reply.like_count,
+        "created_at": _json_datetime(reply.created_at),
+        "updated_at": _json_datetime(reply.updated_at),
+        "author": _author_dict(reply.author),
+        "user_has_liked": reply.id in user_liked_reply_ids
+    }
+
+def _comment_dict(comment: models.Comment, replies: List[models.CommentReply]) -> dict:
+    return {
+        "content": comment.content,
+        "id": comment.id,
+        "author_id": comment.author_id,
+        "like_count": comment.like_count,
+        "reply_count": comment.reply_count,
+        "created_at": _json_datetime(comment.created_at),
+        "updated_at": _json_datetime(comment.updated_at),
+        "author": _author_dict(comment.author),
+        "user_has_liked": False,
+        "replies": [_reply_dict(reply, ()) for reply in replies]
+    }
+
+def _load_reply_previews(db: Session, comment_ids: List[int], limit: int) -> Dict[int, List[models.CommentReply]]:
+    """
+    First `limit` replies of each comment in a single query, ranked per comment
+    with row_number() instead of one query per comment.
+    """
+    if not comment_ids:
+        return {}
+    
+    ranked = db.query(
+        models.CommentReply.id.label("id"),
+        func.row_number().over(
+            partition_by=models.CommentReply.comment_id,
+            order_by=(models.CommentReply.created_at, models.CommentReply.id)
+        ).label("position")
+    ).filter(models.CommentReply.comment_id.in_(comment_ids)).subquery()
+    
+    replies = db.query(models.CommentReply).options(
+        joinedload(models.CommentReply.author)
+    ).join(
+        ranked, ranked.c.id == models.CommentReply.id
+    ).filter(
+        ranked.c.position <= limit
+    ).order_by(models.CommentReply.created_at, models.CommentReply.id).all()
+    
+    replies_by_comment = {comment_id: [] for comment_id in comment_ids}
+    for reply in replies:
+        replies_by_comment[reply.comment_id].append(reply)
+    return replies_by_comment
+
+def _load_comments(db: Session, limit: int, before_id: Optional[int] = None) -> List[dict]:
+    """
+    A page of comments, newest first, with author info and a preview of their
+    replies, as plain dicts without any per-user state. Comments and replies
+    take one query each.
+    """
+    query = db.query(models.Comment).options(joinedload(models.Comment.author))
+    
+    if before_id is not None:
+        # Keyset pagination on (created_at, id)
+        cursor_created_at = db.query(models.Comment.created_at).filter(
+            models.Comment.id == before_id
+        ).scalar()
+        if cursor_created_at is None:
+            # A NULL cursor would silently match nothing
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Comment with id {before_id} not found"
+            )
+        query = query.filter(
+            tuple_(models.Comment.created_at, models.Comment.id) < tuple_(cursor_created_at, before_id)
+        )
+    
+    comments = query.order_by(desc(models.Comment.created_at), desc(models.Comment.id)).limit(limit).all()
+    replies_by_comment = _load_reply_previews(db, [comment.id for comment in comments], INLINE_REPLY_LIMIT)
+    
+    return [_comment_dict(comment, replies_by_comment[comment.id]) for comment in comments]
+
+def _with_user_likes(db: Session, user_id: int, comments: List[dict]) -> List[dict]:
+    """
+    Copies of the comment dicts with user_has_liked filled in for the user.
+    Only the comments and replies passed in are looked up.
+    """
+    comment_ids = [comment["id"] for comment in comments]
+    reply_ids = [reply["id"] for comment in comments for reply in comment["replies"]]
+    
+    user_liked_comment_ids = {
+        row[0] for row in db.query(models.CommentLike.comment_id).filter(
+            models.CommentLike.user_id == user_id,
+            models.CommentLike.comment_id.in_(comment_ids)
+        )
+    } if comment_ids else set()
+    user_liked_reply_ids = {
+        row[0] for row in db.query(models.CommentReplyLike.reply_id).filter(
+            models.CommentReplyLike.user_id == user_id,
+            models.CommentReplyLike.reply_id.in_(reply_ids)
+        )
+    } if reply_ids else set()
+    
+    return [
+        {
+            **comment,
+            "user_has_liked": comment["id"] in user_liked_comment_ids,
+            "replies": [
+                {**reply, "user_has_liked": reply["id"] in user_liked_reply_ids}
+                for reply in comment["replies"]
+            ]
+        }
+        for comment in comments
+    ]
+
 @router.get("/comments", response_model=List[schemas.CommentResponse])
 def get_comments(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    current_user: models.User = Depends(oauth2.get_current_user),
+    limit: int = Query(20, ge=1, le=100),
+    before_id: Optional[int] = None
 ):
-    """Get all comments with their replies, sorted by creation date (newest first)"""
-    
-    # Get comments with author info
-    comments = db.query(models.Comment).options(
-        joinedload(models.Comment.author)
-    ).order_by(desc(models.Comment.created_at)).all()
+    """
+    Get comments, newest first, each with its first replies.
+    Pass the id of the last comment of the previous page as before_id to page further.
+    """
+    return _trusted_response(_with_user_likes(db, current_user.id, _load_comments(db, limit, before_id)))
+
+@router.get("/comments/{comment_id}/replies", response_model=List[schemas.CommentReplyResponse])
+def get_comment_replies(
+    comment_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(oauth2.get_current_user),
+    limit: int = Query(20, ge=1, le=100),
+    after_id: Optional[int] = None
+):
+    """
+    Load more replies of a comment, oldest first.
+    Pass the id of the last reply already shown as after_id.
+    """
+    if not db.query(models.Comment.id).filter(models.Comment.id == comment_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Comment with id {comment_id} not found"
+        )
     
-    # Get user's comment likes
-    user_comment_likes = db.query(models.CommentLike.comment_id).filter(
-        models.CommentLike.user_id == current_user.id
-    ).all()
-    user_liked_comment_ids = {like[0] for like in user_comment_likes}
+    query = db.query(models.CommentReply).options(
+        joinedload(models.CommentReply.author)
+    ).filter(models.CommentReply.comment_id == comment_id)
+    
+    if after_id is not None:
+        cursor_created_at = db.query(models.CommentReply.created_at).filter(
+            models.CommentReply.id == after_id,
+            models.CommentReply.comment_id == comment_id
+        ).scalar()
+        if cursor_created_at is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Reply with id {after_id} not found on comment {comment_id}"
+            )
+        query = query.filter(
+            tuple_(models.CommentReply.created_at, models.CommentReply.id) > tuple_(cursor_created_at, after_id)
+        )
     
-    # Get user's reply likes
-    user_reply_likes = db.query(models.CommentReplyLike.reply_id).filter(
-        models.CommentReplyLike.user_id == current_user.id
-    ).all()
-    user_liked_reply_ids = {like[0] for like in user_reply_likes}
+    replies = query.order_by(models.CommentReply.created_at, models.CommentReply.id).limit(limit).all()
     
-    # Build response
-    comment_responses = []
-    for comment in comments:
-        # Get replies for this comment
-        replies = db.query(models.CommentReply).options(
-            joinedload(models.CommentReply.author)
-        ).filter(
-            models.CommentReply.comment_id == comment.id
-        ).order_by(models.CommentReply.created_at).all()
-        
-        # Build reply responses
-        reply_responses = []
-        for reply in replies:
-            reply_dict = {
-                "id": reply.id,
-                "content": reply.content,
-                "comment_id": reply.comment_id,
-                "author_id": reply.author_id,
-                "like_count": reply.like_count,
-                "created_at": reply.created_at,
-                "updated_at": reply.updated_at,
-                "author": {
-                    "id": reply.author.id,
-                    "username": reply.author.username,
-                    "profile_picture": reply.author.profile_picture
-                },
-                "user_has_liked": reply.id in user_liked_reply_ids
-            }
-            reply_responses.append(schemas.CommentReplyResponse(**reply_dict))
-        
-        # Build comment response
-        comment_dict = {
-            "id": comment.id,
-            "content": comment.content,
-            "author_id": comment.author_id,
-            "like_count": comment.like_count,
-            "reply_count": comment.reply_count,
-            "created_at": comment.created_at,
-            "updated_at": comment.updated_at,
-            "author": {
-                "id": comment.author.id,
-                "username": comment.author.username,
-                "profile_picture": comment.author.profile_picture
-            },
-            "user_has_liked": comment.id in user_liked_comment_ids,
-            "replies": reply_responses
-        }
-        comment_responses.append(schemas.CommentResponse(**comment_dict))
+    reply_ids = [reply.id for reply in replies]
+    user_liked_reply_ids = {
+        row[0] for row in db.query(models.CommentReplyLike.reply_id).filter(
+            models.CommentReplyLike.user_id == current_user.id,
+            models.CommentReplyLike.reply_id.in_(reply_ids)
+        )
+    } if reply_ids else set()
     
-    return comment_responses
+    return _trusted_response([_reply_dict(reply, user_liked_reply_ids) for reply in replies])
 
 @router.post("/comments", response_model=schemas.CommentResponse, status_code=status.HTTP_201_CREATED)
 def create_comment(
@@ -284,6 +378,7 @@ def create_comment(
     db.add(new_comment)
     db.commit()
     db.refresh(new_comment)
+    RFCCacheService.invalidate()
     
     # Load author info
     comment_with_author = db.query(models.Comment).options(
@@ -319,28 +414,14 @@ def create_comment_reply(
 ):
     """Create a reply to a comment"""
     
-    # Check if comment exists
-    comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
-    if not comment:
+    new_reply = RFCService.add_reply(db, current_user.id, comment_id, reply.content)
+    if new_reply is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Comment with id {comment_id} not found"
         )
     
-    # Create the reply
-    new_reply = models.CommentReply(
-        content=reply.content,
-        comment_id=comment_id,
-        author_id=current_user.id
-    )
-    
-    db.add(new_reply)
-    
-    # Update comment reply count
-    comment.reply_count += 1
-    
-    db.commit()
-    db.refresh(new_reply)
+    RFCCacheService.invalidate()
     
     # Load author info
     reply_with_author = db.query(models.CommentReply).options(
@@ -374,38 +455,18 @@ def like_comment(
 ):
     """Like or unlike a comment"""
     
-    # Check if comment exists
-    comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
-    if not comment:
+    liked = RFCService.toggle_comment_like(db, current_user.id, comment_id)
+    if liked is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Comment with id {comment_id} not found"
         )
     
-    # Check if user already liked this comment
-    existing_like = db.query(models.CommentLike).filter(
-        and_(
-            models.CommentLike.user_id == current_user.id,
-            models.CommentLike.comment_id == comment_id
-        )
-    ).first()
-    
-    if existing_like:
-        # Unlike the comment
-        db.delete(existing_like)
-        comment.like_count = max(0, comment.like_count - 1)
-        db.commit()
-        return {"message": "Comment unliked", "liked": False}
-    else:
-        # Like the comment
-        new_like = models.CommentLike(
-            user_id=current_user.id,
-            comment_id=comment_id
-        )
-        db.add(new_like)
-        comment.like_count += 1
-        db.commit()
+    RFCCacheService.invalidate()
+    
+    if liked:
         return {"message": "Comment liked", "liked": True}
+    return {"message": "Comment unliked", "liked": False}
 
 @router.post("/replies/{reply_id}/like")
 def like_reply(
@@ -415,38 +476,18 @@ def like_reply(
 ):
     """Like or unlike a reply"""
     
-    # Check if reply exists
-    reply = db.query(models.CommentReply).filter(models.CommentReply.id == reply_id).first()
-    if not reply:
+    liked = RFCService.toggle_reply_like(db, current_user.id, reply_id)
+    if liked is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Reply with id {reply_id} not found"
         )
     
-    # Check if user already liked this reply
-    existing_like = db.query(models.CommentReplyLike).filter(
-        and_(
-            models.CommentReplyLike.user_id == current_user.id,
-            models.CommentReplyLike.reply_id == reply_id
-        )
-    ).first()
-    
-    if existing_like:
-        # Unlike the reply
-        db.delete(existing_like)
-        reply.like_count = max(0, reply.like_count - 1)
-        db.commit()
-        return {"message": "Reply unliked", "liked": False}
-    else:
-        # Like the reply
-        new_like = models.CommentReplyLike(
-            user_id=current_user.id,
-            reply_id=reply_id
-        )
-        db.add(new_like)
-        reply.like_count += 1
-        db.commit()
+    RFCCacheService.invalidate()
+    
+    if liked:
         return {"message": "Reply liked", "liked": True}
+    return {"message": "Reply unliked", "liked": False}
 
 # Combined endpoint for the main RFC page
 @router.get("", response_model=schemas.RequestForCommentResponse)
@@ -454,106 +495,43 @@ def get_request_for_comment_page(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(oauth2.get_current_user)
 ):
-    """Get all data for the Request for Comment page (features + user votes + comments)"""
-    
-    # Get features (reuse the logic from get_features)
-    features = db.query(models.Feature).order_by(desc(models.Feature.vote_count)).all()
-    user_votes = db.query(models.FeatureVote.feature_id).filter(
-        models.FeatureVote.user_id == current_user.id
-    ).all()
-    user_voted_feature_ids = {vote[0] for vote in user_votes}
-    
-    feature_responses = []
-    for feature in features:
-        feature_dict = {
-            "id": feature.id,
-            "title": feature.title,
-            "description": feature.description,
-            "vote_count": feature.vote_count,
-            "created_at": feature.created_at,
-            "updated_at": feature.updated_at,
-            "created_by": feature.created_by,
-            "user_has_voted": feature.id in user_voted_feature_ids
+    """
+    Get all data for the Request for Comment page (features + user votes + comments).
+    The features and first comments are the same for everyone and come from
+    RFCCacheService; only the user's votes and likes are queried per request.
+    """
+    
+    version, shared = RFCCacheService.get_landing()
+    if shared is None:
+        features = db.query(models.Feature).order_by(desc(models.Feature.vote_count)).all()
+        shared = {
+            "features": [_feature_dict(feature, ()) for feature in features],
+            # First 10 comments with a preview of their replies
+            "comments": _load_comments(db, limit=10)
         }
-        feature_responses.append(schemas.FeatureResponse(**feature_dict))
+        RFCCacheService.set_landing(version, shared)
     
-    # Get user vote summary
-    total_votes = len(user_votes)
-    remaining_votes = max(0, 2 - total_votes)
-    voted_features = [vote[0] for vote in user_votes]
-    
-    user_vote_summary = schemas.UserVoteSummary(
-        total_votes=total_votes,
-        remaining_votes=remaining_votes,
-        voted_features=voted_features
-    )
-    
-    # Get comments (simplified version - first 10 comments)
-    comments = db.query(models.Comment).options(
-        joinedload(models.Comment.author)
-    ).order_by(desc(models.Comment.created_at)).limit(10).all()
-    
-    # Get user's likes for performance
-    user_comment_likes = db.query(models.CommentLike.comment_id).filter(
-        models.CommentLike.user_id == current_user.id
-    ).all()
-    user_liked_comment_ids = {like[0] for like in user_comment_likes}
-    
-    # Get user's reply likes
-    user_reply_likes = db.query(models.CommentReplyLike.reply_id).filter(
-        models.CommentReplyLike.user_id == current_user.id
-    ).all()
-    user_liked_reply_ids = {like[0] for like in user_reply_likes}
-
-    comment_responses = []
-    for comment in comments:
-        # Get replies for this comment (include replies in main page)
-        replies = db.query(models.CommentReply).options(
-            joinedload(models.CommentReply.author)
-        ).filter(
-            models.CommentReply.comment_id == comment.id
-        ).order_by(models.CommentReply.created_at).all()
-        
-        # Build reply responses
-        reply_responses = []
-        for reply in replies:
-            reply_dict = {
-                "id": reply.id,
-                "content": reply.content,
-                "comment_id": reply.comment_id,
-                "author_id": reply.author_id,
-                "like_count": reply.like_count,
-                "created_at": reply.created_at,
-                "updated_at": reply.updated_at,
-                "author": {
-                    "id": reply.author.id,
-                    "username": reply.author.username,
-                    "profile_picture": reply.author.profile_picture
-                },
-                "user_has_liked": reply.id in user_liked_reply_ids
-            }
-            reply_responses.append(schemas.CommentReplyResponse(**reply_dict))
-        
-        comment_dict = {
-            "id": comment.id,
-            "content": comment.content,
-            "author_id": comment.author_id,
-            "like_count": comment.like_count,
-            "reply_count": comment.reply_count,
-            "created_at": comment.created_at,
-            "updated_at": comment.updated_at,
-            "author": {
-                "id": comment.author.id,
-                "username": comment.author.username,
-                "profile_picture": comment.author.profile_picture
-            },
-            "user_has_liked": comment.id in user_liked_comment_ids,
-            "replies": reply_responses  # Include replies in main page
-        }
-        comment_responses.append(schemas.CommentResponse(**comment_dict))
+    # Per-user overlay
+    voted_features = [
+        vote[0] for vote in db.query(models.FeatureVote.feature_id).filter(
+            models.FeatureVote.user_id == current_user.id
+        )
+    ]
+    user_voted_feature_ids = set(voted_features)
+    
+    feature_responses = [
+        {**feature, "user_has_voted": feature["id"] in user_voted_feature_ids}
+        for feature in shared["features"]
+    ]
+    
+    user_vote_summary = {
+        "total_votes": len(voted_features),
+        "remaining_votes": max(0, RFCService.VOTE_LIMIT - len(voted_features)),
+        "voted_features": voted_features
+    }
     
-    return schemas.RequestForCommentResponse(
-        features=feature_responses,
-        user_vote_summary=user_vote_summary,
-        comments=comment_responses
-    )
\ No newline at end of file
+    return _trusted_response({
+        "features": feature_responses,
+        "user_vote_summary": user_vote_summary,
+        "comments": _with_user_likes(db, current_user.id, shared["comments"])
+    })
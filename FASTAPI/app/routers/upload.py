@@ -0,0 +1,133 @@
+# FASTAPI/app/routers/upload.py
+
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from .. import models, schemas, oauth2
+from ..config import settings
+from ..database import get_db
+from ..services import storage_service
+
+router = APIRouter(
+    prefix="/uploads",
+    tags=["uploads"]
+)
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+
+def get_upload_prefix(
+    db: Session,
+    current_user: models.User,
+    purpose: str,
+    event_id: Optional[int]
+) -> str:
+    """Key prefix the current user may upload to for the given purpose (checks event ownership)"""
+    if purpose == "profile_picture":
+        return f"profile-pictures/{current_user.id}/"
+    
+    if event_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="event_id is required for event cover uploads"
+        )
+    
+    event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Event with id {event_id} not found"
+        )
+    
+    if event.creator_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only change the cover of your own events"
+        )
+    
+    return f"event-images/{event_id}/"
+
+@router.post("/presign", response_model=schemas.UploadPresignResponse)
+def presign_upload(
+    upload: schemas.UploadPresignRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    """
+    Get a presigned POST policy for uploading an image straight to the bucket.
+    The client sends the file with the returned fields to upload_url and then
+    calls /uploads/confirm with the object key.
+    """
+    prefix = get_upload_prefix(db, current_user, upload.purpose, upload.event_id)
+    object_key = f"{prefix}{uuid.uuid4()}.{CONTENT_TYPE_EXTENSIONS[upload.content_type]}"
+    
+    try:
+        presigned = storage_service.generate_presigned_upload(
+            object_key,
+            content_type=upload.content_type,
+            max_bytes=settings.UPLOAD_MAX_IMAGE_BYTES,
+            expires_in=settings.UPLOAD_PRESIGN_EXPIRES
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    
+    return {
+        "upload_url": presigned["url"],
+        "fields": presigned["fields"],
+        "object_key": object_key,
+        "expires_in": settings.UPLOAD_PRESIGN_EXPIRES
+    }
+
+@router.post("/confirm", response_model=schemas.UploadConfirmResponse)
+def confirm_upload(
+    upload: schemas.UploadConfirmRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(oauth2.get_current_user)
+):
+    """Attach a directly uploaded object to the user's profile or an event cover"""
+    prefix = get_upload_prefix(db, current_user, upload.purpose, upload.event_id)
+    
+    # Only keys handed out by /uploads/presign for this user/event are accepted
+    if not upload.object_key.startswith(prefix) or "/" in upload.object_key[len(prefix):]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Object key does not belong to this upload target"
+        )
+    
+    try:
+        uploaded = storage_service.object_exists(upload.object_key)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    
+    if not uploaded:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="The object has not been uploaded yet"
+        )
+    
+    file_url = storage_service.generate_file_url(upload.object_key)
+    
+    if upload.purpose == "profile_picture":
+        db.query(models.User).filter(models.User.id == current_user.id).update(
+            {"profile_picture": file_url},
+            synchronize_session=False
+        )
+    else:
+        db.query(models.Event).filter(models.Event.id == upload.event_id).update(
+            {"cover_photo_url": file_url},
+            synchronize_session=False
+        )
+    db.commit()
+    
+    return {"file_url": file_url}
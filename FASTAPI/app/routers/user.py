@@ -1,10 +1,9 @@
-import uuid
 from sqlalchemy import or_, and_, func
 from .. import models, schemas, utils, oauth2
 from fastapi import Body, FastAPI, Response, status, HTTPException, Depends, APIRouter, UploadFile, File
-from ..database import engine, get_db
+from ..database import get_db
 from sqlalchemy.orm import Session
-from ..services import storage_service  # Import the storage_service module
+from ..services import image_service
 from ..services.invitation_service import InvitationService
 from typing import List
 
@@ -63,19 +62,10 @@ async def upload_profile_picture(
     current_user: models.User = Depends(oauth2.get_current_user)
 ):
     """Upload a profile picture for the current user"""
-    # Generate a unique filename
-    original_filename = file.filename
-    file_extension = original_filename.split(".")[-1] if "." in original_filename else "jpg"
-    object_name = f"profile-pictures/{current_user.id}/{uuid.uuid4()}.{file_extension}"
-    
     try:
-        # Reset the file pointer to the beginning
-        file.file.seek(0)
-        # Upload the file to storage service
-        storage_service.upload_fileobj(file.file, object_name)
-        
-        # Get the public URL
-        file_url = storage_service.generate_file_url(object_name)
+        # Resize/re-encode in the process pool and upload every rendition,
+        # unless identical bytes are already stored
+        file_url = await image_service.store_image_deduplicated(await file.read())
         
         # Update the user's profile picture URL
         user_query = db.query(models.User).filter(models.User.id == current_user.id)
@@ -84,6 +74,11 @@ async def upload_profile_picture(
         
         # Return the updated user
         return user_query.first()
+    except image_service.InvalidImageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
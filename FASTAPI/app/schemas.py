@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from datetime import datetime, date, time
-from typing import List, Optional, Annotated
+from typing import Dict, List, Optional, Annotated
 from enum import Enum
 
 # My pydantic models
@@ -177,6 +177,7 @@ class EventResponse(EventBase):
     creator_id: int
     interested_count: int = 0
     going_count: int = 0
+    like_count: int = 0
     status: str = 'ACTIVE'
     created_at: datetime
     updated_at: datetime
@@ -290,10 +291,30 @@ class Notification(NotificationBase):
     user_id: int
     is_read: bool
     created_at: datetime
+    kind: Optional[str] = None
+    event_id: Optional[int] = None
+    actor_count: int = 1
     
     class Config:
         orm_mode = True
 
+class NotificationUnreadCount(BaseModel):
+    unread_count: int
+
+class NotificationBulkRead(BaseModel):
+    ids: Optional[List[int]] = Field(None, max_length=500)
+    up_to_id: Optional[int] = None  # Watermark: everything with id <= up_to_id
+    up_to: Optional[datetime] = None  # Watermark: everything created at or before this time
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if self.ids is None and self.up_to_id is None and self.up_to is None:
+            raise ValueError("Provide ids, up_to_id or up_to")
+        return self
+
+class NotificationBulkReadResult(BaseModel):
+    updated: int
+
 # Add these to FASTAPI/app/schemas.py
 
 class InvitationTokenBase(BaseModel):
@@ -327,6 +348,12 @@ class RSVPResponse(RSVPBase):
     class Config:
         from_attributes = True
 
+class WaitlistResponse(BaseModel):
+    event_id: int
+    user_id: int
+    joined_at: datetime
+    position: int  # 1 = next to be promoted when a spot frees up
+
 class UserWithRSVP(UserOut):
     rsvp_status: Optional[str] = None
     
@@ -498,4 +525,23 @@ class UserCreationResponse(BaseModel):
     token_type: str = "bearer"
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UploadPresignRequest(BaseModel):
+    purpose: str = Field(..., pattern='^(event_cover|profile_picture)$')
+    content_type: str = Field(..., pattern='^image/(jpeg|png|webp|gif)$')
+    event_id: Optional[int] = None  # Required for event_cover
+
+class UploadPresignResponse(BaseModel):
+    upload_url: str
+    fields: Dict[str, str]  # Form fields to POST along with the file
+    object_key: str
+    expires_in: int
+
+class UploadConfirmRequest(BaseModel):
+    purpose: str = Field(..., pattern='^(event_cover|profile_picture)$')
+    object_key: str
+    event_id: Optional[int] = None
+
+class UploadConfirmResponse(BaseModel):
+    file_url: str
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 import asyncio
 import json
 import uuid
+from ..metrics import CHAT_ACTIVE_SESSIONS, CHAT_QUEUE_DEPTH, WEBSOCKET_CONNECTIONS
 
 class ConnectionManager:
     def __init__(self):
@@ -21,9 +22,16 @@ class ConnectionManager:
         # User to session mapping
         self.user_sessions: Dict[int, str] = {}
     
+    def _record_metrics(self):
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
+        CHAT_QUEUE_DEPTH.labels(role="caretaker").set(len(self.caretaker_queue))
+        CHAT_QUEUE_DEPTH.labels(role="helpseeker").set(len(self.helpseeker_queue))
+        CHAT_ACTIVE_SESSIONS.set(len(self.active_sessions))
+    
     async def connect(self, websocket: WebSocket, user_id: int):
         await websocket.accept()
         self.active_connections[user_id] = websocket
+        self._record_metrics()
         
     def disconnect(self, user_id: int):
         # Remove from queues
@@ -37,12 +45,14 @@ class ConnectionManager:
         
         # Remove connection
         self.active_connections.pop(user_id, None)
+        self._record_metrics()
     
     async def add_to_queue(self, user_id: int, role: str):
         if role == "caretaker":
             self.caretaker_queue.add(user_id)
         else:
             self.helpseeker_queue.add(user_id)
+        self._record_metrics()
         
         # Try to match
         await self.try_match()
@@ -64,6 +74,7 @@ class ConnectionManager:
             
             self.user_sessions[caretaker_id] = session_id
             self.user_sessions[helpseeker_id] = session_id
+            self._record_metrics()
             
             # Notify both users
             await self.send_personal_message(
@@ -131,6 +142,7 @@ class ConnectionManager:
         self.user_sessions.pop(session["caretaker_id"], None)
         self.user_sessions.pop(session["helpseeker_id"], None)
         self.active_sessions.pop(session_id, None)
+        self._record_metrics()
     
     async def send_personal_message(self, user_id: int, message: dict):
         websocket = self.active_connections.get(user_id)
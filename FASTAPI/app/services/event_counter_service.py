@@ -0,0 +1,197 @@
+# FASTAPI/app/services/event_counter_service.py
+
+import logging
+from typing import Dict, Optional
+
+import redis
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..database import LazyScript, get_redis
+
+logger = logging.getLogger(__name__)
+
+# Subtract deltas that have been committed to Postgres. Increments that arrived
+# meanwhile stay in the hash; the event leaves the dirty set only once nothing
+# is pending. ARGV: event id, then field/applied-delta pairs.
+_SETTLE_DELTAS = LazyScript("""
+for i = 2, #ARGV, 2 do
+    local applied = tonumber(ARGV[i + 1])
+    if applied ~= 0 then
+        redis.call('HINCRBY', KEYS[1], ARGV[i], -applied)
+    end
+end
+for _, value in ipairs(redis.call('HVALS', KEYS[1])) do
+    if tonumber(value) ~= 0 then
+        return 0
+    end
+end
+redis.call('DEL', KEYS[1])
+redis.call('SREM', KEYS[2], ARGV[1])
+return 1
+""")
+
+
+class EventCounterService:
+    """
+    Write-behind counters for Event.like_count. Likes only touch Redis; a
+    periodic flush applies the accumulated deltas to the events table in one
+    batch, so hot events no longer serialize on their row lock for every like.
+    RSVP counts are maintained transactionally by RSVPService; the RSVP fields
+    are still flushed so deltas queued before that change are not lost.
+    """
+    
+    FIELDS = ("like_count", "interested_count", "going_count")
+    DIRTY_KEY = "events:counters:dirty"
+    
+    @staticmethod
+    def _counters_key(event_id: int) -> str:
+        return f"events:counters:{event_id}"
+    
+    @staticmethod
+    def rsvp_deltas(old_status: Optional[str], new_status: Optional[str]) -> Dict[str, int]:
+        """Counter changes caused by an RSVP moving from old_status to new_status"""
+        deltas = {}
+        for status, field in (("GOING", "going_count"), ("INTERESTED", "interested_count")):
+            delta = int(new_status == status) - int(old_status == status)
+            if delta:
+                deltas[field] = delta
+        return deltas
+    
+    @staticmethod
+    def _apply_to_db(db: Session, rows):
+        db.execute(text("""
+            UPDATE events
+            SET like_count = GREATEST(0, like_count + :like_count),
+                interested_count = GREATEST(0, interested_count + :interested_count),
+                going_count = GREATEST(0, going_count + :going_count)
+            WHERE id = :event_id
+        """), rows)
+        db.commit()
+    
+    @staticmethod
+    def increment(db: Session, event_id: int, deltas: Dict[str, int]):
+        """Queue counter deltas for an event, e.g. {"like_count": 1}"""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        
+        try:
+            pipe = get_redis().pipeline()
+            for field, delta in deltas.items():
+                pipe.hincrby(EventCounterService._counters_key(event_id), field, delta)
+            pipe.sadd(EventCounterService.DIRTY_KEY, event_id)
+            pipe.execute()
+        except redis.RedisError:
+            # Without Redis fall back to updating the row directly
+            row = {field: deltas.get(field, 0) for field in EventCounterService.FIELDS}
+            row["event_id"] = event_id
+            EventCounterService._apply_to_db(db, [row])
+    
+    @staticmethod
+    def _settle(event_id, row: Dict[str, int]):
+        args = [event_id]
+        for field in EventCounterService.FIELDS:
+            args += [field, row.get(field, 0)]
+        _SETTLE_DELTAS(
+            keys=[EventCounterService._counters_key(event_id), EventCounterService.DIRTY_KEY],
+            args=args
+        )
+    
+    @staticmethod
+    def flush(db: Session, batch_size: int = 500) -> int:
+        """
+        Apply pending deltas to the events table. Returns the number of events updated.
+        
+        Deltas stay in Redis until the UPDATE has committed and are only then
+        subtracted, so a failed or killed flush leaves them for the next run.
+        A worker dying between commit and settling re-applies that batch once;
+        reconcile() corrects such drift.
+        """
+        flushed = 0
+        event_ids = list(get_redis().smembers(EventCounterService.DIRTY_KEY))
+        
+        for start in range(0, len(event_ids), batch_size):
+            batch = event_ids[start:start + batch_size]
+            
+            pipe = get_redis().pipeline(transaction=False)
+            for event_id in batch:
+                pipe.hgetall(EventCounterService._counters_key(event_id))
+            
+            rows = []
+            for event_id, deltas in zip(batch, pipe.execute()):
+                row = {field: int(deltas.get(field, 0)) for field in EventCounterService.FIELDS}
+                row["event_id"] = int(event_id)
+                rows.append(row)
+            
+            pending = [row for row in rows if any(row[field] for field in EventCounterService.FIELDS)]
+            if pending:
+                try:
+                    EventCounterService._apply_to_db(db, pending)
+                except Exception:
+                    db.rollback()
+                    raise
+            
+            for row in rows:
+                EventCounterService._settle(row["event_id"], row)
+            flushed += len(pending)
+        
+        return flushed
+    
+    @staticmethod
+    def reconcile(db: Session, batch_size: int = 500) -> int:
+        """
+        Recount like_count from event_likes and going/interested_count from rsvps,
+        correcting drift the GREATEST(0, ...) clamp would otherwise hide. Event
+        rows are locked before counting, so RSVP writes (which update the event
+        row in the same transaction) cannot race the recount. like_count is left
+        alone for events with deltas still waiting in Redis.
+        
+        Returns the number of events whose counters were corrected.
+        """
+        dirty = [int(event_id) for event_id in get_redis().smembers(EventCounterService.DIRTY_KEY)]
+        corrected = 0
+        last_id = 0
+        
+        while True:
+            event_ids = db.execute(text("""
+                SELECT id FROM events
+                WHERE id > :last_id
+                ORDER BY id
+                LIMIT :batch_size
+                FOR UPDATE
+            """), {"last_id": last_id, "batch_size": batch_size}).scalars().all()
+            if not event_ids:
+                db.commit()
+                break
+            
+            fixed = db.execute(text("""
+                UPDATE events e
+                SET like_count = CASE WHEN e.id = ANY(CAST(:dirty AS integer[]))
+                                      THEN e.like_count ELSE actual.like_count END,
+                    going_count = actual.going_count,
+                    interested_count = actual.interested_count
+                FROM (
+                    SELECT ev.id,
+                           (SELECT count(*) FROM event_likes l WHERE l.event_id = ev.id) AS like_count,
+                           (SELECT count(*) FROM rsvps r WHERE r.event_id = ev.id AND r.status = 'GOING') AS going_count,
+                           (SELECT count(*) FROM rsvps r WHERE r.event_id = ev.id AND r.status = 'INTERESTED') AS interested_count
+                    FROM events ev
+                    WHERE ev.id = ANY(CAST(:event_ids AS integer[]))
+                ) actual
+                WHERE e.id = actual.id
+                  AND (
+                      (e.like_count <> actual.like_count AND NOT e.id = ANY(CAST(:dirty AS integer[])))
+                      OR e.going_count <> actual.going_count
+                      OR e.interested_count <> actual.interested_count
+                  )
+                RETURNING e.id
+            """), {"event_ids": event_ids, "dirty": dirty}).scalars().all()
+            db.commit()
+            
+            if fixed:
+                logger.warning("Corrected drifted counters for events %s", fixed)
+            corrected += len(fixed)
+            last_id = event_ids[-1]
+        
+        return corrected
@@ -0,0 +1,101 @@
+# FASTAPI/app/services/image_service.py
+
+import asyncio
+import hashlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from ..config import settings
+from . import storage_service
+
+
+# Key prefix for content-addressed image renditions
+IMAGE_PREFIX = "images"
+
+
+class InvalidImageError(ValueError):
+    """Raised when uploaded bytes cannot be decoded as an image"""
+
+
+_pool = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    # Created on first use so each gunicorn worker gets its own pool after fork
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_PROCESS_WORKERS)
+    return _pool
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def render_renditions(data: bytes) -> Dict[str, bytes]:
+    """
+    Decode an image and encode every rendition as WebP.
+    Runs in the process pool: decoding and resizing are CPU bound.
+    EXIF orientation is applied to the pixels and the metadata is dropped.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            image = ImageOps.exif_transpose(original)
+            has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+            image = image.convert("RGBA" if has_alpha else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise InvalidImageError(f"Could not decode image: {e}")
+    
+    renditions = {}
+    for name, longest_edge in storage_service.RENDITIONS.items():
+        rendition = image.copy()
+        rendition.thumbnail((longest_edge, longest_edge), Image.LANCZOS)  # Only ever downscales
+        buffer = io.BytesIO()
+        rendition.save(buffer, format="WEBP", quality=settings.IMAGE_WEBP_QUALITY, method=4)
+        renditions[name] = buffer.getvalue()
+    
+    return renditions
+
+
+async def store_image(data: bytes, base_key: str) -> str:
+    """
+    Process an uploaded image into all renditions and upload them under base_key.
+
+    :param data: Raw uploaded bytes.
+    :param base_key: Key prefix; renditions are stored as {base_key}/{rendition}.webp.
+    :return: Public URL of the "full" rendition (other renditions via storage_service.rendition_url).
+    """
+    loop = asyncio.get_running_loop()
+    renditions = await loop.run_in_executor(_get_pool(), render_renditions, data)
+    
+    def upload(name):
+        return storage_service.upload_fileobj_async(
+            io.BytesIO(renditions[name]),
+            storage_service.rendition_key(base_key, name),
+            storage_service.RENDITION_CONTENT_TYPE
+        )
+    
+    # "full" goes last: its presence marks a complete set for deduplication
+    await asyncio.gather(*(upload(name) for name in renditions if name != "full"))
+    await upload("full")
+    
+    return storage_service.generate_file_url(storage_service.rendition_key(base_key, "full"))
+
+
+async def store_image_deduplicated(data: bytes) -> str:
+    """
+    Store an image under a content-addressed key (images/{sha256}).
+    If the same bytes were uploaded before, nothing is processed or uploaded
+    and the existing URL is returned.
+    """
+    base_key = storage_service.content_key(IMAGE_PREFIX, hashlib.sha256(data).hexdigest())
+    full_key = storage_service.rendition_key(base_key, "full")
+    
+    if await storage_service.stored_object_exists_async(full_key):
+        return storage_service.generate_file_url(full_key)
+    
+    return await store_image(data, base_key)
@@ -1,13 +1,122 @@
 # FASTAPI/app/services/notification_service.py
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, text, tuple_
+import redis
 from .. import models
-from typing import List, Optional
+from ..config import settings
+from ..database import LazyScript, get_redis
+from ..metrics import NOTIFICATION_FANOUT
+from typing import Callable, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+
+# Only adjust the cached counter when it is already present. A missing key means
+# the count has expired or was never computed and will be rebuilt from the table.
+# Every adjustment also bumps the user's epoch (KEYS[2]) so a reconciliation
+# that counted before this change knows its result is stale.
+_ADJUST_IF_EXISTS = LazyScript("""
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+    if value < 0 then
+        redis.call('SET', KEYS[1], 0, 'KEEPTTL')
+        value = 0
+    end
+    return value
+end
+return nil
+""")
+
+# Cache a recomputed count only if no adjustment happened since the epoch
+# ARGV[1] was read before counting
+_SET_IF_EPOCH = LazyScript("""
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+""")
+
+
+class InvalidCursorError(Exception):
+    """Raised when a pagination cursor does not name one of the user's notifications"""
+
 
 class NotificationService:
     """Service for handling notifications including friend-event matches"""
     
+    # Notification kinds that are coalesced per (user, event)
+    EVENT_MATCH = "event_match"
+    
+    @staticmethod
+    def _unread_count_key(user_id: int) -> str:
+        return f"notifications:unread:{user_id}"
+    
+    @staticmethod
+    def _unread_epoch_key(user_id: int) -> str:
+        return f"notifications:unread:{user_id}:epoch"
+    
+    @staticmethod
+    def _adjust_unread_count(user_id: int, delta: int):
+        """Apply a delta to the cached unread counter if it is currently cached"""
+        if not delta:
+            return
+        try:
+            _ADJUST_IF_EXISTS(
+                keys=[NotificationService._unread_count_key(user_id), NotificationService._unread_epoch_key(user_id)],
+                # The epoch has to outlive any count computed while it was current
+                args=[delta, 2 * settings.NOTIFICATION_UNREAD_COUNT_TTL]
+            )
+        except redis.RedisError:
+            # The counter is a cache; the next reconciliation rebuilds it from the table
+            pass
+    
+    @staticmethod
+    def reconcile_unread_count(db: Session, user_id: int) -> int:
+        """
+        Recompute the unread counter from the notifications table and cache it.
+        The count is not cached if a notification was created or read while it
+        was being computed, since the cached value could miss that change.
+        """
+        try:
+            epoch = get_redis().get(NotificationService._unread_epoch_key(user_id)) or "0"
+        except redis.RedisError:
+            epoch = None
+        
+        count = db.query(models.Notification).filter(
+            and_(
+                models.Notification.user_id == user_id,
+                models.Notification.is_read == False
+            )
+        ).count()
+        
+        if epoch is None:
+            return count
+        try:
+            _SET_IF_EPOCH(
+                keys=[NotificationService._unread_count_key(user_id), NotificationService._unread_epoch_key(user_id)],
+                args=[epoch, count, settings.NOTIFICATION_UNREAD_COUNT_TTL]
+            )
+        except redis.RedisError:
+            pass
+        
+        return count
+    
+    @staticmethod
+    def get_unread_count(db: Session, user_id: int) -> int:
+        """Get the number of unread notifications, served from Redis when cached"""
+        try:
+            cached = get_redis().get(NotificationService._unread_count_key(user_id))
+        except redis.RedisError:
+            cached = None
+        
+        if cached is not None:
+            return int(cached)
+        
+        # Cache miss or expired TTL: reconcile against the table
+        return NotificationService.reconcile_unread_count(db, user_id)
+    
     @staticmethod
     def create_notification(db: Session, user_id: int, content: str) -> models.Notification:
         """Create a new notification for a user"""
@@ -19,67 +128,248 @@ class NotificationService:
         db.add(notification)
         db.commit()
         db.refresh(notification)
+        
+        NotificationService._adjust_unread_count(user_id, 1)
         return notification
     
     @staticmethod
     def mark_as_read(db: Session, notification_id: int, user_id: int) -> Optional[models.Notification]:
         """Mark a notification as read for a specific user"""
-        notification = db.query(models.Notification).filter(
+        # Conditional UPDATE: of two concurrent calls only one changes the row
+        # and decrements the counter
+        changed = db.query(models.Notification).filter(
+            and_(
+                models.Notification.id == notification_id,
+                models.Notification.user_id == user_id,
+                models.Notification.is_read == False
+            )
+        ).update({"is_read": True}, synchronize_session=False)
+        db.commit()
+        
+        if changed == 1:
+            NotificationService._adjust_unread_count(user_id, -1)
+        
+        return db.query(models.Notification).filter(
             and_(
                 models.Notification.id == notification_id,
                 models.Notification.user_id == user_id
             )
         ).first()
+    
+    @staticmethod
+    def mark_many_as_read(
+        db: Session,
+        user_id: int,
+        ids: Optional[List[int]] = None,
+        up_to_id: Optional[int] = None,
+        up_to: Optional[datetime] = None
+    ) -> int:
+        """
+        Mark a batch of a user's notifications as read in a single UPDATE.
+        Without any filter every unread notification of the user is marked.
+        Returns the number of notifications that changed.
+        """
+        query = db.query(models.Notification).filter(
+            and_(
+                models.Notification.user_id == user_id,
+                models.Notification.is_read == False
+            )
+        )
         
-        if notification:
-            notification.is_read = True
-            db.commit()
-            db.refresh(notification)
+        if ids is not None:
+            query = query.filter(models.Notification.id.in_(ids))
+        if up_to_id is not None:
+            query = query.filter(models.Notification.id <= up_to_id)
+        if up_to is not None:
+            query = query.filter(models.Notification.created_at <= up_to)
         
-        return notification
+        updated = query.update({"is_read": True}, synchronize_session=False)
+        db.commit()
+        
+        NotificationService._adjust_unread_count(user_id, -updated)
+        return updated
     
     @staticmethod
-    def get_user_notifications(db: Session, user_id: int, limit: int = 20, skip: int = 0, unread_only: bool = False):
-        """Get notifications for a user with pagination"""
+    def get_user_notifications(
+        db: Session,
+        user_id: int,
+        limit: int = 20,
+        skip: int = 0,
+        unread_only: bool = False,
+        before_id: Optional[int] = None
+    ):
+        """
+        Get notifications for a user, newest first.
+        Pass the id of the last notification of the previous page as before_id
+        for keyset pagination; skip is kept for older clients. Raises
+        InvalidCursorError if before_id is not one of the user's notifications
+        (e.g. it has been archived since).
+        """
         query = db.query(models.Notification).filter(models.Notification.user_id == user_id)
         
         if unread_only:
             query = query.filter(models.Notification.is_read == False)
+        
+        query = query.order_by(
+            models.Notification.created_at.desc(),
+            models.Notification.id.desc()
+        )
+        
+        if before_id is not None:
+            # Seek past the cursor row on the (created_at, id) index instead of counting offset rows
+            cursor_created_at = db.query(models.Notification.created_at).filter(
+                models.Notification.id == before_id,
+                models.Notification.user_id == user_id
+            ).scalar()
+            if cursor_created_at is None:
+                raise InvalidCursorError(f"Notification {before_id} is not in your inbox")
+            query = query.filter(
+                tuple_(models.Notification.created_at, models.Notification.id) < tuple_(cursor_created_at, before_id)
+            )
+        else:
+            query = query.offset(skip)
+        
+        return query.limit(limit).all()
+    
+    @staticmethod
+    def archive_read_notifications(db: Session, older_than_days: int, batch_size: int = 1000) -> int:
+        """
+        Move read notifications older than the given age into notifications_archive.
+        Works in batches so each transaction stays short. Returns the number of rows moved.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        total = 0
+        
+        while True:
+            result = db.execute(text("""
+                WITH moved AS (
+                    DELETE FROM notifications
+                    WHERE id IN (
+                        SELECT id FROM notifications
+                        WHERE is_read AND created_at < :cutoff
+                        ORDER BY created_at
+                        LIMIT :batch_size
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, user_id, content, is_read, created_at, kind, event_id, actor_count
+                ),
+                archived AS (
+                    -- A row left in the archive by an interrupted run is overwritten, never dropped
+                    INSERT INTO notifications_archive (id, user_id, content, is_read, created_at, kind, event_id, actor_count)
+                    SELECT id, user_id, content, is_read, created_at, kind, event_id, actor_count FROM moved
+                    ON CONFLICT (id) DO UPDATE SET
+                        user_id = EXCLUDED.user_id,
+                        content = EXCLUDED.content,
+                        is_read = EXCLUDED.is_read,
+                        created_at = EXCLUDED.created_at,
+                        kind = EXCLUDED.kind,
+                        event_id = EXCLUDED.event_id,
+                        actor_count = EXCLUDED.actor_count
+                )
+                SELECT count(*) FROM moved
+            """), {"cutoff": cutoff, "batch_size": batch_size})
+            moved = result.scalar()
+            db.commit()
             
-        return query.order_by(models.Notification.created_at.desc()).offset(skip).limit(limit).all()
+            total += moved
+            if moved < batch_size:
+                break
+        
+        return total
     
     @staticmethod
-    def notify_event_match(db: Session, user_id: int, event_id: int):
+    def _event_match_content(actor_name: str, actor_count: int, event_title: str) -> str:
+        if actor_count == 1:
+            return f"You and {actor_name} both liked the event '{event_title}'!"
+        return f"You and {actor_count} friends liked the event '{event_title}'!"
+    
+    @staticmethod
+    def coalesce_event_notifications(
+        db: Session,
+        kind: str,
+        event_id: int,
+        actors_by_recipient: Dict[int, List[models.User]],
+        render: Callable[[str, int], str]
+    ) -> List[models.Notification]:
         """
-        Check if any friends of the user have also liked this event,
-        and create notifications for both the user and the friends
+        Create or extend one notification per recipient for (kind, event).
+        A unique partial index allows one unread notification per (user, kind,
+        event), so concurrent writers upsert the same row instead of racing to
+        insert duplicates. Within the coalescing window the row's actor_ids are
+        merged with the new actors, which keeps actor_count distinct however
+        often someone unlikes and likes again; an older unread row is reset to
+        the new actors and moved to the top of the inbox.
+        render(latest_actor_name, actor_count) builds the text.
         """
-        # Get all friendships where this user is part of (either requester or addressee)
-        friends_ids = []
+        if not actors_by_recipient:
+            return []
         
-        # Get friendships where user is requester
-        requester_friendships = db.query(models.Friendship).filter(
-            and_(
-                models.Friendship.requester_id == user_id,
-                models.Friendship.status == "accepted"
-            )
-        ).all()
+        NOTIFICATION_FANOUT.labels(kind=kind).observe(len(actors_by_recipient))
         
-        # Add addressee IDs to friends list
-        for friendship in requester_friendships:
-            friends_ids.append(friendship.addressee_id)
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.NOTIFICATION_COALESCE_WINDOW_MINUTES)
         
-        # Get friendships where user is addressee
-        addressee_friendships = db.query(models.Friendship).filter(
+        ids = []
+        created_for = []
+        # Fixed order so concurrent fan-outs lock the index entries in the same order
+        for recipient_id in sorted(actors_by_recipient):
+            actors = actors_by_recipient[recipient_id]
+            row = db.execute(text("""
+                INSERT INTO notifications (user_id, content, is_read, kind, event_id, actor_ids, actor_count)
+                VALUES (:user_id, '', false, :kind, :event_id,
+                        CAST(:actor_ids AS integer[]), cardinality(CAST(:actor_ids AS integer[])))
+                ON CONFLICT (user_id, kind, event_id) WHERE NOT is_read DO UPDATE SET
+                    actor_ids = CASE WHEN notifications.created_at >= :cutoff
+                        THEN ARRAY(SELECT DISTINCT unnest(notifications.actor_ids || EXCLUDED.actor_ids))
+                        ELSE EXCLUDED.actor_ids END,
+                    actor_count = cardinality(CASE WHEN notifications.created_at >= :cutoff
+                        THEN ARRAY(SELECT DISTINCT unnest(notifications.actor_ids || EXCLUDED.actor_ids))
+                        ELSE EXCLUDED.actor_ids END),
+                    created_at = CASE WHEN notifications.created_at >= :cutoff
+                        THEN notifications.created_at ELSE now() END
+                RETURNING id, actor_count, (xmax = 0) AS inserted
+            """), {
+                "user_id": recipient_id,
+                "kind": kind,
+                "event_id": event_id,
+                "actor_ids": sorted({actor.id for actor in actors}),
+                "cutoff": cutoff
+            }).first()
+            
+            db.execute(text("UPDATE notifications SET content = :content WHERE id = :id"), {
+                "id": row.id,
+                "content": render(actors[-1].username, row.actor_count)
+            })
+            ids.append(row.id)
+            if row.inserted:
+                created_for.append(recipient_id)
+        
+        db.commit()
+        
+        for recipient_id in created_for:
+            NotificationService._adjust_unread_count(recipient_id, 1)
+        
+        return db.query(models.Notification).filter(models.Notification.id.in_(ids)).all()
+    
+    @staticmethod
+    def notify_event_match(db: Session, user_id: int, event_id: int):
+        """
+        Check if any friends of the user have also liked this event,
+        and create (or coalesce into) notifications for both the user and the friends
+        """
+        # Get IDs of all accepted friends (user can be requester or addressee)
+        friendships = db.query(models.Friendship).filter(
             and_(
-                models.Friendship.addressee_id == user_id,
+                or_(
+                    models.Friendship.requester_id == user_id,
+                    models.Friendship.addressee_id == user_id
+                ),
                 models.Friendship.status == "accepted"
             )
         ).all()
-        
-        # Add requester IDs to friends list
-        for friendship in addressee_friendships:
-            friends_ids.append(friendship.requester_id)
+        friends_ids = [
+            friendship.addressee_id if friendship.requester_id == user_id else friendship.requester_id
+            for friendship in friendships
+        ]
         
         # Get the event details
         event = db.query(models.Event).filter(models.Event.id == event_id).first()
@@ -87,37 +377,34 @@ class NotificationService:
             return []
         
         # Get all friends who also liked this event
-        friend_likes = db.query(models.EventLike).filter(
+        friends_who_liked = db.query(models.User).join(
+            models.EventLike,
+            models.EventLike.user_id == models.User.id
+        ).filter(
             and_(
                 models.EventLike.event_id == event_id,
-                models.EventLike.user_id.in_(friends_ids)
+                models.User.id.in_(friends_ids)
             )
         ).all()
         
-        # Create notifications for matches
-        notifications = []
+        if not friends_who_liked:
+            return []
         
         # Get username of current user
         current_user = db.query(models.User).filter(models.User.id == user_id).first()
         
-        # Notify friends that current user also liked this event
-        for like in friend_likes:
-            friend = db.query(models.User).filter(models.User.id == like.user_id).first()
-            
-            # Notify current user about the friend match
-            user_notification = NotificationService.create_notification(
-                db=db,
-                user_id=user_id,
-                content=f"You and {friend.username} both liked the event '{event.title}'!"
-            )
-            notifications.append(user_notification)
-            
-            # Notify the friend about the match
-            friend_notification = NotificationService.create_notification(
-                db=db,
-                user_id=friend.id,
-                content=f"You and {current_user.username} both liked the event '{event.title}'!"
-            )
-            notifications.append(friend_notification)
+        # The current user hears about all matching friends at once,
+        # each friend hears about the current user
+        actors_by_recipient = {user_id: friends_who_liked}
+        for friend in friends_who_liked:
+            actors_by_recipient[friend.id] = [current_user]
         
-        return notifications
\ No newline at end of file
+        return NotificationService.coalesce_event_notifications(
+            db=db,
+            kind=NotificationService.EVENT_MATCH,
+            event_id=event_id,
+            actors_by_recipient=actors_by_recipient,
+            render=lambda actor_name, actor_count: NotificationService._event_match_content(
+                actor_name, actor_count, event.title
+            )
+        )
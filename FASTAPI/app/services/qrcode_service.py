@@ -1,34 +1,71 @@
 # FASTAPI/app/services/qrcode_service.py
 import qrcode
+import qrcode.image.svg
 import io
 import base64
+import hashlib
+from functools import lru_cache
+from importlib import metadata
 from typing import Optional
 
+# Distinct (data, size, format) renders kept per worker
+QR_CACHE_SIZE = 256
+
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+# Bump when _render_qr_code's settings change; part of every ETag together with
+# the qrcode version, so a different renderer never answers 304 for old bytes
+RENDER_VERSION = 1
+
+try:
+    _RENDERER = f"{RENDER_VERSION}|qrcode-{metadata.version('qrcode')}"
+except metadata.PackageNotFoundError:
+    _RENDERER = str(RENDER_VERSION)
+
 class QRCodeService:
     @staticmethod
-    def generate_qr_code(data: str, size: int = 10) -> bytes:
-        """Generate a QR code from the given data."""
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=size,
-            border=4,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert image to bytes
-        img_byte_arr = io.BytesIO()
-        img.save(img_byte_arr, format='PNG')
-        img_byte_arr = img_byte_arr.getvalue()
-        
-        return img_byte_arr
+    def generate_qr_code(data: str, size: int = 10, fmt: str = "png") -> bytes:
+        """
+        Generate a QR code from the given data as PNG or SVG.
+        Renders are cached, so repeated requests for the same code cost nothing.
+        """
+        return _render_qr_code(data, size, fmt)
+    
+    @staticmethod
+    def etag(data: str, size: int, fmt: str) -> str:
+        """Strong ETag for a render: identical inputs and renderer produce identical bytes."""
+        digest = hashlib.sha256(f"{_RENDERER}|{data}|{size}|{fmt}".encode()).hexdigest()[:32]
+        return f'"{digest}"'
     
     @staticmethod
     def generate_qr_code_base64(data: str, size: int = 10) -> str:
         """Generate a QR code and return as base64 string for embedding in HTML."""
         qr_bytes = QRCodeService.generate_qr_code(data, size)
         base64_encoded = base64.b64encode(qr_bytes).decode('ascii')
-        return f"data:image/png;base64,{base64_encoded}"
\ No newline at end of file
+        return f"data:image/png;base64,{base64_encoded}"
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def _render_qr_code(data: str, size: int, fmt: str) -> bytes:
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=size,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    if fmt == "svg":
+        # Vector output skips rasterizing and PNG encoding entirely
+        img = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+    else:
+        img = qr.make_image(fill_color="black", back_color="white")
+    
+    # Convert image to bytes
+    img_byte_arr = io.BytesIO()
+    if fmt == "svg":
+        img.save(img_byte_arr)
+    else:
+        img.save(img_byte_arr, format='PNG')
+    return img_byte_arr.getvalue()
@@ -0,0 +1,86 @@
+# FASTAPI/app/services/rfc_cache_service.py
+
+import json
+import logging
+import uuid
+from typing import Optional, Tuple
+
+import redis
+from fastapi.encoders import jsonable_encoder
+
+from ..config import settings
+from ..database import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class RFCCacheService:
+    """
+    Caches the user-independent part of the RFC landing page (features and the
+    first page of comments) as serialized JSON. Writes replace a version token
+    instead of deleting the entry, so a request that was building the payload
+    while the write committed stores it under a version nobody reads any more.
+    Tokens are random rather than a counter: a counter would restart after a
+    Redis flush and revive ETags clients still hold for older data.
+    """
+    
+    VERSION_KEY = "rfc:landing:version"
+    
+    @staticmethod
+    def _landing_key(version: str) -> str:
+        return f"rfc:landing:{version}"
+    
+    @staticmethod
+    def _version() -> str:
+        """Current version token, seeded with a fresh one when missing"""
+        version = get_redis().get(RFCCacheService.VERSION_KEY)
+        if version is None:
+            get_redis().set(RFCCacheService.VERSION_KEY, uuid.uuid4().hex, nx=True)
+            version = get_redis().get(RFCCacheService.VERSION_KEY)
+        return version
+    
+    @staticmethod
+    def get_landing() -> Tuple[Optional[str], Optional[dict]]:
+        """
+        Returns (version, payload). payload is None on a miss; version is None
+        when Redis is unavailable, in which case nothing should be cached.
+        """
+        try:
+            version = RFCCacheService._version()
+            cached = get_redis().get(RFCCacheService._landing_key(version))
+        except redis.RedisError:
+            return None, None
+        return version, json.loads(cached) if cached else None
+    
+    @staticmethod
+    def current_version() -> Optional[str]:
+        """
+        Version of the RFC data, replaced by every write. None when Redis is
+        unavailable.
+        """
+        try:
+            return RFCCacheService._version()
+        except redis.RedisError:
+            return None
+    
+    @staticmethod
+    def set_landing(version: Optional[str], payload: dict):
+        if version is None:
+            return
+        try:
+            get_redis().setex(
+                RFCCacheService._landing_key(version),
+                settings.RFC_LANDING_CACHE_TTL,
+                json.dumps(jsonable_encoder(payload))
+            )
+        except redis.RedisError:
+            pass
+    
+    @staticmethod
+    def invalidate():
+        """Call after committing a vote, comment, reply, like or new feature"""
+        try:
+            get_redis().set(RFCCacheService.VERSION_KEY, uuid.uuid4().hex)
+        except redis.RedisError:
+            # The entry still expires after RFC_LANDING_CACHE_TTL
+            logger.warning("Could not invalidate the RFC landing page cache")
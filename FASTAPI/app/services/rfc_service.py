@@ -0,0 +1,168 @@
+# FASTAPI/app/services/rfc_service.py
+
+from typing import Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .. import models
+
+
+class AlreadyVotedError(Exception):
+    """Raised when a user votes for a feature they already voted for"""
+
+
+class VoteLimitError(Exception):
+    """Raised when a user has used all of their feature votes"""
+
+
+class RFCService:
+    """
+    Votes and likes for the RFC page. Counters are changed with atomic
+    UPDATE ... SET x = x + 1 statements in the same transaction as the vote or
+    like row, so concurrent requests never lose an update. The per-user vote
+    limit is a unique (user_id, slot) constraint: a vote claims the lowest free
+    slot in a single INSERT, and parallel votes cannot share a slot.
+    """
+    
+    VOTE_LIMIT = 2
+    
+    @staticmethod
+    def cast_vote(db: Session, user_id: int, feature_id: int):
+        """
+        Record a vote and bump the feature's vote_count.
+        Returns the (user_id, feature_id, voted_at) row, or None if the feature does not exist.
+        """
+        # A lost race for a slot is retried; there are only VOTE_LIMIT slots to lose
+        for _ in range(RFCService.VOTE_LIMIT):
+            try:
+                vote = db.execute(text("""
+                    INSERT INTO feature_votes (user_id, feature_id, slot)
+                    SELECT :user_id, :feature_id, free.slot
+                    FROM generate_series(1, :vote_limit) AS free(slot)
+                    WHERE free.slot NOT IN (SELECT slot FROM feature_votes WHERE user_id = :user_id)
+                    ORDER BY free.slot
+                    LIMIT 1
+                    ON CONFLICT DO NOTHING
+                    RETURNING user_id, feature_id, voted_at
+                """), {"user_id": user_id, "feature_id": feature_id, "vote_limit": RFCService.VOTE_LIMIT}).first()
+            except IntegrityError:
+                # Foreign key violation: the feature does not exist
+                db.rollback()
+                return None
+            
+            if vote is not None:
+                db.query(models.Feature).filter(models.Feature.id == feature_id).update(
+                    {models.Feature.vote_count: models.Feature.vote_count + 1},
+                    synchronize_session=False
+                )
+                db.commit()
+                return vote
+            
+            db.rollback()
+            
+            # Nothing inserted: find out why
+            voted_feature_ids = {
+                row[0] for row in db.query(models.FeatureVote.feature_id).filter(
+                    models.FeatureVote.user_id == user_id
+                )
+            }
+            if feature_id in voted_feature_ids:
+                raise AlreadyVotedError()
+            if len(voted_feature_ids) >= RFCService.VOTE_LIMIT:
+                raise VoteLimitError()
+        
+        raise VoteLimitError()
+    
+    @staticmethod
+    def remove_vote(db: Session, user_id: int, feature_id: int) -> bool:
+        """Delete a vote, freeing its slot. Returns False if there was no such vote."""
+        removed = db.query(models.FeatureVote).filter(
+            models.FeatureVote.user_id == user_id,
+            models.FeatureVote.feature_id == feature_id
+        ).delete(synchronize_session=False)
+        
+        if not removed:
+            db.rollback()
+            return False
+        
+        db.query(models.Feature).filter(models.Feature.id == feature_id).update(
+            {models.Feature.vote_count: func.greatest(0, models.Feature.vote_count - 1)},
+            synchronize_session=False
+        )
+        db.commit()
+        return True
+    
+    @staticmethod
+    def _toggle_like(db: Session, like_table: str, target_column: str, counter_table: str,
+                     user_id: int, target_id: int) -> Optional[bool]:
+        """
+        Remove the user's like if present, otherwise add it, adjusting the
+        target's like_count by the number of rows actually changed.
+        Returns the new liked state, or None if the target does not exist.
+        """
+        params = {"user_id": user_id, "target_id": target_id}
+        
+        removed = db.execute(text(f"""
+            DELETE FROM {like_table}
+            WHERE user_id = :user_id AND {target_column} = :target_id
+            RETURNING user_id
+        """), params).first()
+        
+        if removed is not None:
+            db.execute(text(f"""
+                UPDATE {counter_table} SET like_count = GREATEST(0, like_count - 1) WHERE id = :target_id
+            """), params)
+            db.commit()
+            return False
+        
+        try:
+            inserted = db.execute(text(f"""
+                INSERT INTO {like_table} (user_id, {target_column})
+                VALUES (:user_id, :target_id)
+                ON CONFLICT DO NOTHING
+                RETURNING user_id
+            """), params).first()
+        except IntegrityError:
+            # Foreign key violation: the comment/reply does not exist
+            db.rollback()
+            return None
+        
+        # A parallel request of the same user may have inserted the like first;
+        # it also did the increment
+        if inserted is not None:
+            db.execute(text(f"""
+                UPDATE {counter_table} SET like_count = like_count + 1 WHERE id = :target_id
+            """), params)
+        db.commit()
+        return True
+    
+    @staticmethod
+    def toggle_comment_like(db: Session, user_id: int, comment_id: int) -> Optional[bool]:
+        return RFCService._toggle_like(db, "comment_likes", "comment_id", "comments", user_id, comment_id)
+    
+    @staticmethod
+    def toggle_reply_like(db: Session, user_id: int, reply_id: int) -> Optional[bool]:
+        return RFCService._toggle_like(db, "comment_reply_likes", "reply_id", "comment_replies", user_id, reply_id)
+    
+    @staticmethod
+    def add_reply(db: Session, user_id: int, comment_id: int, content: str) -> Optional[models.CommentReply]:
+        """Create a reply and bump the comment's reply_count. Returns None if the comment does not exist."""
+        bumped = db.query(models.Comment).filter(models.Comment.id == comment_id).update(
+            {models.Comment.reply_count: models.Comment.reply_count + 1},
+            synchronize_session=False
+        )
+        if not bumped:
+            db.rollback()
+            return None
+        
+        new_reply = models.CommentReply(
+            content=content,
+            comment_id=comment_id,
+            author_id=user_id
+        )
+        db.add(new_reply)
+        db.commit()
+        db.refresh(new_reply)
+        return new_reply
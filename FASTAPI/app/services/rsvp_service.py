@@ -0,0 +1,266 @@
+# FASTAPI/app/services/rsvp_service.py
+
+from typing import Dict, Optional
+
+from sqlalchemy import and_, exists, text
+from sqlalchemy.orm import Session
+
+from .. import models
+from .event_counter_service import EventCounterService
+from .notification_service import NotificationService
+
+
+class EventFullError(Exception):
+    """Raised when a GOING RSVP would exceed the event's guest limit"""
+
+
+class RSVPService:
+    """
+    RSVP writes with transactional count maintenance. Every change reads the
+    previous status under a row lock, writes the new one, applies the delta to
+    the event counts and commits once. GOING spots are taken
+    with a conditional increment against Event.guest_limit, and released
+    spots go to the event waitlist in join order.
+    """
+    
+    @staticmethod
+    def get_event_like_state(db: Session, user_id: int, event_id: int) -> Optional[bool]:
+        """
+        Check event existence and the user's like in one query.
+        Returns None if the event does not exist, else whether the user liked it.
+        """
+        row = db.query(
+            exists().where(
+                and_(
+                    models.EventLike.user_id == user_id,
+                    models.EventLike.event_id == event_id
+                )
+            )
+        ).filter(models.Event.id == event_id).first()
+        
+        return None if row is None else row[0]
+    
+    @staticmethod
+    def _apply_count_deltas(db: Session, event_id: int, deltas: Dict[str, int]):
+        if not deltas:
+            return
+        db.execute(text("""
+            UPDATE events
+            SET going_count = GREATEST(0, going_count + :going_count),
+                interested_count = GREATEST(0, interested_count + :interested_count)
+            WHERE id = :event_id
+        """), {
+            "event_id": event_id,
+            "going_count": deltas.get("going_count", 0),
+            "interested_count": deltas.get("interested_count", 0)
+        })
+    
+    @staticmethod
+    def _reserve_going_spot(db: Session, event_id: int, interested_delta: int = 0):
+        """
+        Take one GOING spot with a conditional increment. The row lock on the
+        event is held only until commit, so concurrent RSVPs queue briefly on
+        the row instead of oversubscribing after a COUNT.
+        """
+        reserved = db.execute(text("""
+            UPDATE events
+            SET going_count = going_count + 1,
+                interested_count = GREATEST(0, interested_count + :interested_count)
+            WHERE id = :event_id
+              AND (guest_limit IS NULL OR going_count < guest_limit)
+            RETURNING id
+        """), {"event_id": event_id, "interested_count": interested_delta}).first()
+        
+        if reserved is None:
+            raise EventFullError(event_id)
+    
+    @staticmethod
+    def _write_rsvp(db: Session, user_id: int, event_id: int, status: str):
+        """
+        Insert or update the RSVP and adjust counts without committing.
+        Returns (row, old_status); old_status is None for a new RSVP.
+        Raises EventFullError when a new GOING would exceed the guest limit.
+        """
+        params = {"user_id": user_id, "event_id": event_id, "status": status}
+        
+        # Two attempts: losing the race for the first insert means the other
+        # transaction has committed the row by the time we read it again
+        for _ in range(2):
+            # Lock the existing row so its status cannot change under the delta
+            old_status = db.execute(text("""
+                SELECT status FROM rsvps
+                WHERE user_id = :user_id AND event_id = :event_id
+                FOR UPDATE
+            """), params).scalar()
+            
+            if old_status is not None:
+                row = db.execute(text("""
+                    UPDATE rsvps SET status = :status, responded_at = now()
+                    WHERE user_id = :user_id AND event_id = :event_id
+                    RETURNING user_id, event_id, status, responded_at
+                """), params).first()
+            else:
+                row = db.execute(text("""
+                    INSERT INTO rsvps (user_id, event_id, status, responded_at)
+                    VALUES (:user_id, :event_id, :status, now())
+                    ON CONFLICT (user_id, event_id) DO NOTHING
+                    RETURNING user_id, event_id, status, responded_at
+                """), params).first()
+            
+            if row is not None:
+                break
+        else:
+            raise RuntimeError(f"RSVP of user {user_id} for event {event_id} kept changing concurrently")
+        
+        deltas = EventCounterService.rsvp_deltas(old_status, status)
+        
+        if deltas.get("going_count", 0) > 0:
+            RSVPService._reserve_going_spot(db, event_id, deltas.get("interested_count", 0))
+            # Going now, so no longer waiting for a spot
+            db.query(models.EventWaitlist).filter(
+                and_(
+                    models.EventWaitlist.event_id == event_id,
+                    models.EventWaitlist.user_id == user_id
+                )
+            ).delete(synchronize_session=False)
+        else:
+            RSVPService._apply_count_deltas(db, event_id, deltas)
+        
+        return row, old_status
+    
+    @staticmethod
+    def _promote_from_waitlist(db: Session, event_id: int) -> Optional[int]:
+        """Give a freed GOING spot to the longest-waiting user. Returns the promoted user id."""
+        try:
+            with db.begin_nested():
+                next_user_id = db.execute(text("""
+                    DELETE FROM event_waitlist
+                    WHERE (event_id, user_id) = (
+                        SELECT event_id, user_id FROM event_waitlist
+                        WHERE event_id = :event_id
+                        ORDER BY joined_at, user_id
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING user_id
+                """), {"event_id": event_id}).scalar()
+                
+                if next_user_id is None:
+                    return None
+                
+                RSVPService._write_rsvp(db, next_user_id, event_id, "GOING")
+                return next_user_id
+        except EventFullError:
+            # The limit was lowered meanwhile; the savepoint keeps them on the waitlist
+            return None
+    
+    @staticmethod
+    def _notify_promoted(db: Session, user_id: int, event_id: int):
+        event = db.query(models.Event).filter(models.Event.id == event_id).first()
+        NotificationService.create_notification(
+            db=db,
+            user_id=user_id,
+            content=f"A spot opened up: you are now going to '{event.title}'!"
+        )
+    
+    @staticmethod
+    def upsert_rsvp(db: Session, user_id: int, event_id: int, status: str):
+        """
+        Insert or update the user's RSVP and adjust the event counts in the same
+        transaction, enforcing the guest limit for GOING and promoting the next
+        waitlisted user when a GOING spot is released.
+        Returns the stored row (user_id, event_id, status, responded_at).
+        """
+        try:
+            row, old_status = RSVPService._write_rsvp(db, user_id, event_id, status)
+            
+            promoted_user_id = None
+            if old_status == "GOING" and status != "GOING":
+                promoted_user_id = RSVPService._promote_from_waitlist(db, event_id)
+            
+            db.commit()
+        except EventFullError:
+            db.rollback()
+            raise
+        
+        if promoted_user_id is not None:
+            RSVPService._notify_promoted(db, promoted_user_id, event_id)
+        
+        return row
+    
+    @staticmethod
+    def delete_rsvp(db: Session, user_id: int, event_id: int) -> Optional[str]:
+        """Delete the user's RSVP and adjust counts. Returns the removed status, or None if there was none."""
+        old_status = db.execute(text("""
+            DELETE FROM rsvps
+            WHERE user_id = :user_id AND event_id = :event_id
+            RETURNING status
+        """), {"user_id": user_id, "event_id": event_id}).scalar()
+        
+        if old_status is None:
+            db.rollback()
+            return None
+        
+        RSVPService._apply_count_deltas(db, event_id, EventCounterService.rsvp_deltas(old_status, None))
+        
+        promoted_user_id = None
+        if old_status == "GOING":
+            promoted_user_id = RSVPService._promote_from_waitlist(db, event_id)
+        
+        db.commit()
+        
+        if promoted_user_id is not None:
+            RSVPService._notify_promoted(db, promoted_user_id, event_id)
+        
+        return old_status
+    
+    @staticmethod
+    def join_waitlist(db: Session, user_id: int, event_id: int):
+        """
+        Queue the user for a GOING spot on a full event.
+        Returns (joined_at, position), or None if the event currently has free spots.
+        """
+        is_full = db.query(models.Event.id).filter(
+            and_(
+                models.Event.id == event_id,
+                models.Event.guest_limit.isnot(None),
+                models.Event.going_count >= models.Event.guest_limit
+            )
+        ).first() is not None
+        
+        if not is_full:
+            return None
+        
+        db.execute(text("""
+            INSERT INTO event_waitlist (event_id, user_id)
+            VALUES (:event_id, :user_id)
+            ON CONFLICT (event_id, user_id) DO NOTHING
+        """), {"event_id": event_id, "user_id": user_id})
+        db.commit()
+        
+        return RSVPService.get_waitlist_position(db, user_id, event_id)
+    
+    @staticmethod
+    def get_waitlist_position(db: Session, user_id: int, event_id: int):
+        """Returns (joined_at, position) for a waitlisted user, or None"""
+        row = db.execute(text("""
+            SELECT mine.joined_at,
+                   (SELECT count(*) FROM event_waitlist ahead
+                    WHERE ahead.event_id = mine.event_id
+                      AND (ahead.joined_at, ahead.user_id) <= (mine.joined_at, mine.user_id)) AS position
+            FROM event_waitlist mine
+            WHERE mine.event_id = :event_id AND mine.user_id = :user_id
+        """), {"event_id": event_id, "user_id": user_id}).first()
+        
+        return None if row is None else (row.joined_at, row.position)
+    
+    @staticmethod
+    def leave_waitlist(db: Session, user_id: int, event_id: int) -> bool:
+        removed = db.query(models.EventWaitlist).filter(
+            and_(
+                models.EventWaitlist.event_id == event_id,
+                models.EventWaitlist.user_id == user_id
+            )
+        ).delete(synchronize_session=False)
+        db.commit()
+        return removed > 0
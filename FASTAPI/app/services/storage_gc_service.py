@@ -0,0 +1,91 @@
+# FASTAPI/app/services/storage_gc_service.py
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Set
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from . import storage_service
+
+logger = logging.getLogger(__name__)
+
+
+class StorageGCService:
+    """
+    Deletes bucket objects nothing points at any more. Replacing a profile
+    picture or cover photo, or deleting an event, leaves the old object behind;
+    with content-addressed keys it may still be shared by another row, so
+    objects are only removed after diffing the whole bucket against every URL
+    stored in users.profile_picture and events.cover_photo_url.
+    """
+    
+    # Prefixes written by this app; anything else in the bucket is left alone
+    MANAGED_PREFIXES = ("images/", "uploads/", "event-images/", "profile-pictures/")
+    
+    @staticmethod
+    def referenced_groups(db: Session) -> Set[str]:
+        """Object groups referenced by any user or event"""
+        rows = db.execute(text("""
+            SELECT profile_picture AS url FROM users WHERE profile_picture IS NOT NULL
+            UNION
+            SELECT cover_photo_url AS url FROM events WHERE cover_photo_url IS NOT NULL
+        """))
+        groups = set()
+        for (url,) in rows:
+            key = storage_service.object_key_from_url(url)
+            if key:
+                groups.add(storage_service.object_group(key))
+        return groups
+    
+    @staticmethod
+    def collect(db: Session, grace_hours: int) -> int:
+        """
+        Delete unreferenced objects older than the grace period. The grace period
+        covers uploads whose URL has not been saved yet (presigned uploads awaiting
+        /uploads/confirm, files uploaded while an event form is still open).
+        
+        Returns the number of deleted objects.
+        """
+        grace = timedelta(hours=grace_hours)
+        cutoff = datetime.now(timezone.utc) - grace
+        
+        # Snapshot references before listing: anything referenced later is either
+        # younger than the cutoff or shows up in the recently-used set
+        referenced = StorageGCService.referenced_groups(db)
+        # Give the connection back while the bucket is being listed
+        db.close()
+        
+        candidates = []
+        for prefix in StorageGCService.MANAGED_PREFIXES:
+            for obj in storage_service.list_objects(prefix):
+                if obj["LastModified"] >= cutoff:
+                    continue
+                if storage_service.object_group(obj["Key"]) in referenced:
+                    continue
+                candidates.append(obj["Key"])
+        
+        if not candidates:
+            return 0
+        
+        # Re-read the recently-used set right before every DeleteObjects call so a
+        # dedup hit recorded while listing or deleting still protects its object.
+        # Dedup never hands out objects unused for longer than the grace period,
+        # so a hit after this check uploads the object again rather than
+        # reusing the one being deleted; only a re-upload that completes within
+        # this single request can still race the delete.
+        deleted = 0
+        for start in range(0, len(candidates), storage_service.DELETE_BATCH_SIZE):
+            batch = candidates[start:start + storage_service.DELETE_BATCH_SIZE]
+            recently_used = storage_service.recently_used_groups(time.time() - grace.total_seconds())
+            orphans = [key for key in batch if storage_service.object_group(key) not in recently_used]
+            if not orphans:
+                continue
+            
+            removed = storage_service.delete_objects(orphans)
+            if removed < len(orphans):
+                logger.warning("Storage GC failed to delete %d objects", len(orphans) - removed)
+            deleted += removed
+        return deleted
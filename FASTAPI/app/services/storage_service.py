@@ -1,7 +1,14 @@
 import os
-import boto3
-from botocore.client import Config
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Iterator, Optional, Set
+from urllib.parse import urlparse
+import redis
 from ..config import settings
+from ..database import get_redis
 
 SPACES_REGION = settings.SPACES_REGION
 SPACES_BUCKET = settings.SPACES_BUCKET
@@ -9,14 +16,56 @@ SPACES_ENDPOINT = settings.SPACES_ENDPOINT
 SPACES_KEY = settings.SPACES_KEY
 SPACES_SECRET = settings.SPACES_SECRET
 
-s3_client = boto3.client(
-    "s3",
-    region_name=SPACES_REGION,
-    endpoint_url=SPACES_ENDPOINT,  # Ensure you include the HTTPS scheme
-    aws_access_key_id=SPACES_KEY,
-    aws_secret_access_key=SPACES_SECRET,
-    config=Config(signature_version="s3v4")  # Use S3v4 for signing requests
-)
+# boto3 takes a noticeable time to import and to build a client, so both happen
+# on first use rather than whenever a module imports storage_service
+_s3_client = None
+
+def get_s3_client():
+    global _s3_client
+    if _s3_client is None:
+        import boto3
+        from botocore.client import Config
+
+        _s3_client = boto3.client(
+            "s3",
+            region_name=SPACES_REGION,
+            endpoint_url=SPACES_ENDPOINT,  # Ensure you include the HTTPS scheme
+            aws_access_key_id=SPACES_KEY,
+            aws_secret_access_key=SPACES_SECRET,
+            config=Config(
+                signature_version="s3v4",  # Use S3v4 for signing requests
+                max_pool_connections=settings.STORAGE_MAX_POOL_CONNECTIONS
+            )
+        )
+    return _s3_client
+
+# boto3 is blocking. Async handlers hand storage calls to this dedicated pool so a
+# slow Spaces request never stalls the event loop or the threadpool serving sync
+# endpoints. One thread per pooled HTTP connection.
+_executor = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.STORAGE_MAX_POOL_CONNECTIONS,
+            thread_name_prefix="storage"
+        )
+    return _executor
+
+async def _run_in_executor(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(func, *args, **kwargs))
+
+def shutdown():
+    """Stop the storage executor and close the S3 client's connection pool (called on shutdown)."""
+    global _executor, _s3_client
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    if _s3_client is not None:
+        _s3_client.close()
+        _s3_client = None
 
 # cors_configuration = {
 #     "CORSRules": [
@@ -30,7 +79,7 @@ s3_client = boto3.client(
 #     ]
 # }
 
-# s3_client.put_bucket_cors(Bucket=settings.SPACES_BUCKET, CORSConfiguration=cors_configuration)
+# get_s3_client().put_bucket_cors(Bucket=settings.SPACES_BUCKET, CORSConfiguration=cors_configuration)
 
 def upload_file(file_path: str, object_name: str) -> str:
     """
@@ -41,7 +90,7 @@ def upload_file(file_path: str, object_name: str) -> str:
     :return: Public URL to the uploaded file.
     """
     try:
-        s3_client.upload_file(file_path, SPACES_BUCKET, object_name, ExtraArgs={"ACL": "public-read"})
+        get_s3_client().upload_file(file_path, SPACES_BUCKET, object_name, ExtraArgs={"ACL": "public-read"})
         # Construct the public URL (if your bucket is set to public or using a CDN)
         file_url = f"https://{SPACES_BUCKET}.{SPACES_ENDPOINT}/{object_name}"
         return file_url
@@ -49,17 +98,60 @@ def upload_file(file_path: str, object_name: str) -> str:
         # Handle exceptions (logging, re-raising, custom error message, etc.)
         raise RuntimeError(f"File upload failed: {e}")
     
-def upload_fileobj(file_obj, object_name: str) -> None:
+# Content-Type served for raw uploads, chosen from the key's extension and
+# never from the client. Anything else (HTML, SVG, scripts, ...) is served as
+# an attachment so a public object can never render in the bucket's origin.
+SAFE_CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "pdf": "application/pdf",
+}
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+def safe_extension(filename: Optional[str]) -> str:
+    """Lower-cased extension of a client filename, or "dat" if it is missing or unusual"""
+    extension = filename.rsplit(".", 1)[-1].lower() if filename and "." in filename else ""
+    if not extension.isalnum() or len(extension) > 10:
+        return "dat"
+    return extension
+
+def upload_headers(object_name: str) -> dict:
+    """ContentType/ContentDisposition for a raw upload, derived from its key only"""
+    content_type = SAFE_CONTENT_TYPES.get(object_name.rsplit(".", 1)[-1].lower(), DEFAULT_CONTENT_TYPE)
+    headers = {"ContentType": content_type}
+    if not content_type.startswith("image/"):
+        headers["ContentDisposition"] = "attachment"
+    return headers
+
+def upload_fileobj(file_obj, object_name: str, content_type: str = None) -> None:
     """
     Uploads a file-like object to the configured DigitalOcean Spaces bucket.
     
     :param file_obj: A file-like object (e.g., from FastAPI's UploadFile.file)
     :param object_name: The target file name in the Spaces bucket.
+    :param content_type: Content-Type of content the server produced itself
+        (e.g. image renditions). When omitted it is chosen by upload_headers.
     """
+    extra_args = {"ACL": "public-read"}
+    if content_type:
+        extra_args["ContentType"] = content_type
+    else:
+        extra_args.update(upload_headers(object_name))
     try:
-        s3_client.upload_fileobj(file_obj, SPACES_BUCKET, object_name, ExtraArgs={"ACL": "public-read"})
+        get_s3_client().upload_fileobj(file_obj, SPACES_BUCKET, object_name, ExtraArgs=extra_args)
     except Exception as e:
         raise RuntimeError(f"File upload failed: {e}")
+    _index_object(object_name)
+
+async def upload_fileobj_async(file_obj, object_name: str, content_type: str = None) -> None:
+    """
+    Non-blocking variant of upload_fileobj for async handlers.
+    The multipart upload runs on the storage executor.
+    """
+    await _run_in_executor(upload_fileobj, file_obj, object_name, content_type)
 
 def delete_file(object_name: str) -> None:
     """
@@ -68,15 +160,243 @@ def delete_file(object_name: str) -> None:
     :param object_name: Name of the file in the bucket to delete.
     """
     try:
-        s3_client.delete_object(Bucket=SPACES_BUCKET, Key=object_name,)
+        get_s3_client().delete_object(Bucket=SPACES_BUCKET, Key=object_name,)
     except Exception as e:
         raise RuntimeError(f"File deletion failed: {e}")
+    try:
+        get_redis().srem(OBJECT_INDEX_KEY, object_name)
+    except redis.RedisError:
+        pass
+
+async def delete_file_async(object_name: str) -> None:
+    """Non-blocking variant of delete_file for async handlers."""
+    await _run_in_executor(delete_file, object_name)
+
+def delete_objects(object_names) -> int:
+    """
+    Deletes many objects with multi-object delete requests, up to
+    DELETE_BATCH_SIZE keys per call.
+
+    :param object_names: Keys to delete.
+    :return: Number of keys the bucket reported as deleted.
+    """
+    object_names = list(object_names)
+    deleted = 0
+    for start in range(0, len(object_names), DELETE_BATCH_SIZE):
+        batch = object_names[start:start + DELETE_BATCH_SIZE]
+        try:
+            response = get_s3_client().delete_objects(
+                Bucket=SPACES_BUCKET,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+            )
+        except Exception as e:
+            raise RuntimeError(f"Batch deletion failed: {e}")
+        
+        failed = {error["Key"] for error in response.get("Errors", [])}
+        removed = [key for key in batch if key not in failed]
+        deleted += len(removed)
+        if removed:
+            try:
+                get_redis().srem(OBJECT_INDEX_KEY, *removed)
+            except redis.RedisError:
+                pass
+    return deleted
+
+def list_objects(prefix: str) -> Iterator[dict]:
+    """
+    Iterates over every object under a prefix, following pagination.
+
+    :param prefix: Key prefix to list, e.g. "images/".
+    :return: Iterator of {"Key", "LastModified", "Size", ...} dicts.
+    """
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    try:
+        for page in paginator.paginate(Bucket=SPACES_BUCKET, Prefix=prefix):
+            yield from page.get("Contents", [])
+    except Exception as e:
+        raise RuntimeError(f"Listing objects failed: {e}")
+
+# Redis set of keys known to exist in the bucket, so duplicate uploads skip the HEAD request
+OBJECT_INDEX_KEY = "storage:objects"
+HASH_CHUNK_SIZE = 1024 * 1024
+# Sorted set of keys uploaded or handed out to a deduplicated upload, scored by
+# time, so the garbage collector never deletes an object that is being referenced
+RECENTLY_USED_KEY = "storage:recently_used"
+# Upper bound of keys per DeleteObjects request
+DELETE_BATCH_SIZE = 1000
+
+def _index_object(object_name: str) -> None:
+    try:
+        pipe = get_redis().pipeline()
+        pipe.sadd(OBJECT_INDEX_KEY, object_name)
+        # A fresh upload counts as a use, so dedup may hand it out during the grace period
+        pipe.zadd(RECENTLY_USED_KEY, {object_name: time.time()})
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+def recently_used_groups(since: float) -> Set[str]:
+    """
+    Object groups (see object_group) reused by a deduplicated upload after `since`.
+    Older entries are dropped from the set. Redis errors propagate: without this
+    set the garbage collector cannot tell which old objects are safe to delete.
+    """
+    get_redis().zremrangebyscore(RECENTLY_USED_KEY, "-inf", f"({since}")
+    keys = get_redis().zrangebyscore(RECENTLY_USED_KEY, since, "+inf")
+    return {object_group(key) for key in keys}
+
+def content_key(prefix: str, digest: str, extension: str = None) -> str:
+    """Content-addressed key: identical bytes always map to the same object."""
+    key = f"{prefix}/{digest}"
+    return f"{key}.{extension}" if extension else key
+
+async def hash_upload(upload) -> str:
+    """
+    SHA-256 of an UploadFile, read in chunks so large files are never held in memory.
+    Leaves the file positioned at the start.
+    """
+    digest = hashlib.sha256()
+    await upload.seek(0)
+    while True:
+        chunk = await upload.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+    await upload.seek(0)
+    return digest.hexdigest()
+
+def stored_object_exists(object_name: str) -> bool:
+    """
+    Like object_exists, but answers from the local object index when possible
+    and records positive HEAD results in it.
+    
+    The use is recorded before answering, and only objects uploaded or reused
+    within the garbage collector's grace period count as stored. Anything older
+    may be in a collection run that already decided to delete it, so the caller
+    uploads it again instead. Without Redis nothing can be protected from the
+    collector and the answer is always False.
+    """
+    now = time.time()
+    try:
+        pipe = get_redis().pipeline()
+        pipe.zscore(RECENTLY_USED_KEY, object_name)
+        pipe.zadd(RECENTLY_USED_KEY, {object_name: now})
+        pipe.sismember(OBJECT_INDEX_KEY, object_name)
+        last_used, _, indexed = pipe.execute()
+    except redis.RedisError:
+        return False
+    
+    if last_used is None or last_used < now - settings.STORAGE_GC_GRACE_HOURS * 3600:
+        return False
+    
+    if not indexed:
+        if not object_exists(object_name):
+            return False
+        _index_object(object_name)
+    return True
+
+async def stored_object_exists_async(object_name: str) -> bool:
+    return await _run_in_executor(stored_object_exists, object_name)
+
+def generate_presigned_upload(object_name: str, content_type: str, max_bytes: int, expires_in: int) -> dict:
+    """
+    Generates a presigned POST policy so a client can upload straight to the bucket.
+    The policy pins the key, ACL and Content-Type and caps the object size.
+
+    :param object_name: Key the object must be stored under.
+    :param content_type: Content-Type the client has to send.
+    :param max_bytes: Largest accepted object size.
+    :param expires_in: Seconds the policy stays valid.
+    :return: {"url": ..., "fields": {...}} to be sent as a multipart form.
+    """
+    try:
+        return get_s3_client().generate_presigned_post(
+            Bucket=SPACES_BUCKET,
+            Key=object_name,
+            Fields={"acl": "public-read", "Content-Type": content_type},
+            Conditions=[
+                {"acl": "public-read"},
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_bytes],
+            ],
+            ExpiresIn=expires_in
+        )
+    except Exception as e:
+        raise RuntimeError(f"Presigning upload failed: {e}")
+
+def object_exists(object_name: str) -> bool:
+    """
+    Checks whether an object is present in the bucket with a HEAD request.
+
+    :param object_name: Name of the file in the bucket.
+    """
+    from botocore.exceptions import ClientError
+
+    try:
+        get_s3_client().head_object(Bucket=SPACES_BUCKET, Key=object_name)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise RuntimeError(f"Object lookup failed: {e}")
+
+# Processed images are stored as {base}/{rendition}.webp; longest edge in pixels
+RENDITIONS = {"thumbnail": 160, "card": 640, "full": 1600}
+RENDITION_CONTENT_TYPE = "image/webp"
+
+def rendition_key(base_key: str, rendition: str) -> str:
+    return f"{base_key}/{rendition}.webp"
+
+def rendition_url(file_url: str, rendition: str) -> str:
+    """
+    Points a stored image URL at another rendition of the same image.
+    URLs of unprocessed uploads are returned unchanged.
+
+    :param file_url: URL as stored on the user/event (may be None).
+    :param rendition: One of RENDITIONS.
+    """
+    if not file_url:
+        return file_url
+    base, _, filename = file_url.rpartition("/")
+    if filename.endswith(".webp") and filename[:-len(".webp")] in RENDITIONS:
+        return f"{base}/{rendition}.webp"
+    return file_url
+
+def object_group(object_name: str) -> str:
+    """
+    Renditions of one processed image live and die together, so they are grouped
+    under their base key. Any other object is its own group.
+    """
+    base, _, filename = object_name.rpartition("/")
+    if filename.endswith(".webp") and filename[:-len(".webp")] in RENDITIONS:
+        return base
+    return object_name
+
+def object_key_from_url(file_url: str) -> Optional[str]:
+    """
+    Inverse of generate_file_url (and of the older upload_file URLs).
+    Returns None for URLs that do not point at our bucket.
+    """
+    if not file_url:
+        return None
+    parsed = urlparse(file_url)
+    if not parsed.netloc.startswith(f"{SPACES_BUCKET}."):
+        return None
+    key = parsed.path.lstrip("/")
+    # CDN URLs repeat the bucket name as the first path segment
+    if parsed.netloc.endswith(".cdn.digitaloceanspaces.com") and key.startswith(f"{SPACES_BUCKET}/"):
+        key = key[len(SPACES_BUCKET) + 1:]
+    return key or None
 
-def generate_file_url(object_name: str) -> str:
+def generate_file_url(object_name: str, rendition: str = None) -> str:
     """
     Generates a CDN URL for an object stored in DigitalOcean Spaces.
 
     :param object_name: Name of the file in the bucket.
+    :param rendition: Optional rendition (thumbnail, card, full) for processed images.
     :return: CDN URL for the file.
     """
-    return f"https://{SPACES_BUCKET}.{SPACES_REGION}.cdn.digitaloceanspaces.com/{SPACES_BUCKET}/{object_name}"
\ No newline at end of file
+    file_url = f"https://{SPACES_BUCKET}.{SPACES_REGION}.cdn.digitaloceanspaces.com/{SPACES_BUCKET}/{object_name}"
+    if rendition:
+        return rendition_url(file_url, rendition)
+    return file_url
\ No newline at end of file
@@ -1,6 +1,6 @@
 import jwt
 from datetime import datetime
-from ..database import redis_client
+from ..database import get_redis
 from ..config import settings
 
 class TokenService:
@@ -29,7 +29,7 @@ class TokenService:
             
             # Store token in Redis with TTL
             redis_key = f"blacklist:{token}"
-            redis_client.setex(redis_key, ttl, 1)
+            get_redis().setex(redis_key, ttl, 1)
             
             return True
         except jwt.PyJWTError:
@@ -40,4 +40,4 @@ class TokenService:
     def is_blacklisted(token: str) -> bool:
         """Check if a token is blacklisted"""
         redis_key = f"blacklist:{token}"
-        return bool(redis_client.exists(redis_key))
\ No newline at end of file
+        return bool(get_redis().exists(redis_key))
\ No newline at end of file
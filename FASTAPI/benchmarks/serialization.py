@@ -0,0 +1,87 @@
+# FASTAPI/benchmarks/serialization.py
+"""
+Per-item cost of the ways a list endpoint can turn rows into a JSON body.
+
+    cd FASTAPI && python -m benchmarks.serialization [items] [rounds]
+
+"double validation" is what the RFC routes used to do: build schema objects
+by hand, which FastAPI dumps and validates again against response_model.
+"response_model only" returns plain dicts and lets FastAPI validate once.
+"orjson direct" is the ORJSONResponse path the routes use now.
+"""
+import json
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+
+from app import schemas
+
+
+def make_comments(count: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    author = {"id": 1, "username": "someone", "profile_picture": None}
+    return [
+        {
+            "id": i,
+            "content": "A comment of ordinary length about a feature request." * 2,
+            "author_id": 1,
+            "like_count": i % 7,
+            "reply_count": 3,
+            "created_at": now,
+            "updated_at": now,
+            "author": author,
+            "user_has_liked": bool(i % 2),
+            "replies": [
+                {
+                    "id": i * 10 + r,
+                    "content": "A reply.",
+                    "comment_id": i,
+                    "author_id": 1,
+                    "like_count": r,
+                    "created_at": now,
+                    "updated_at": now,
+                    "author": author,
+                    "user_has_liked": False
+                }
+                for r in range(3)
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+def main(items: int = 100, rounds: int = 200):
+    comments = make_comments(items)
+    adapter = TypeAdapter(List[schemas.CommentResponse])
+    
+    def fastapi_serialize(content):
+        # Mirrors fastapi.routing.serialize_response + JSONResponse.render
+        validated = adapter.validate_python(content, from_attributes=True)
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+    
+    def double_validation():
+        objects = [schemas.CommentResponse(**comment) for comment in comments]
+        return fastapi_serialize([obj.model_dump() for obj in objects])
+    
+    def response_model_only():
+        return fastapi_serialize(comments)
+    
+    def orjson_direct():
+        return orjson.dumps(comments)
+    
+    print(f"{items} comments with 3 replies each, best of 5 x {rounds} rounds")
+    for name, func in (
+        ("double validation", double_validation),
+        ("response_model only", response_model_only),
+        ("orjson direct", orjson_direct),
+    ):
+        best = min(timeit.repeat(func, number=rounds, repeat=5)) / rounds
+        print(f"  {name:<22} {best * 1e6 / items:8.2f} us/item")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,24 @@
+# Gunicorn settings used by gunicorn.service (-c gunicorn.conf.py)
+import os
+import shutil
+
+# Every worker writes its metrics to files in this directory and /metrics merges
+# them. It has to be in the environment before prometheus_client is imported.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+
+workers = 4
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = "0.0.0.0:8000"
+
+
+def on_starting(server):
+    # Files left by a previous run would be counted as live workers
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,51 @@
+# FASTAPI/tests/test_import_time.py
+"""
+Guards worker start-up: importing the app must not pull in boto3 (it is loaded
+on first storage use) and must stay within a time budget. The budget is
+relative to importing fastapi in the same process, so it scales with the
+machine instead of failing on a slow CI runner.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# app.main may take at most this many times as long as fastapi, its largest dependency
+IMPORT_BUDGET_FACTOR = 5
+
+
+def _import_app():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    if result.returncode != 0:
+        pytest.skip(f"app.main cannot be imported here: {result.stderr.strip().splitlines()[-1]}")
+    
+    # Lines look like "import time:       self [us] |  cumulative | imported package"
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+@pytest.fixture(scope="module")
+def import_timings():
+    return _import_app()
+
+
+def test_app_import_does_not_load_boto3(import_timings):
+    loaded = [name for name in import_timings if name.split(".")[0] in ("boto3", "botocore")]
+    assert loaded == []
+
+
+def test_app_import_within_budget(import_timings):
+    assert import_timings["app.main"] < IMPORT_BUDGET_FACTOR * import_timings["fastapi"]
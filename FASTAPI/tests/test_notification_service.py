@@ -0,0 +1,64 @@
+# FASTAPI/tests/test_notification_service.py
+import pytest
+
+try:
+    from app import models
+    from app.services.notification_service import NotificationService
+except Exception as e:  # dependencies or the deployment's settings are missing
+    pytest.skip(f"app cannot be imported here: {e}", allow_module_level=True)
+
+
+def _befriend_and_like(db, user, friends, event):
+    for friend in friends:
+        db.add(models.Friendship(requester_id=user.id, addressee_id=friend.id, status="accepted"))
+        db.add(models.EventLike(user_id=friend.id, event_id=event.id))
+    db.add(models.EventLike(user_id=user.id, event_id=event.id))
+    db.commit()
+
+
+def _open_matches(db, user_id, event_id):
+    db.expire_all()
+    return db.query(models.Notification).filter(
+        models.Notification.user_id == user_id,
+        models.Notification.kind == NotificationService.EVENT_MATCH,
+        models.Notification.event_id == event_id,
+        models.Notification.is_read == False
+    ).all()
+
+
+def test_relike_does_not_inflate_actor_count(db, make_user, make_event):
+    user, friend = make_user(), make_user()
+    event = make_event()
+    _befriend_and_like(db, user, [friend], event)
+    
+    NotificationService.notify_event_match(db, friend.id, event.id)
+    
+    # The friend unlikes and likes again within the coalescing window
+    db.query(models.EventLike).filter(
+        models.EventLike.user_id == friend.id,
+        models.EventLike.event_id == event.id
+    ).delete(synchronize_session=False)
+    db.add(models.EventLike(user_id=friend.id, event_id=event.id))
+    db.commit()
+    NotificationService.notify_event_match(db, friend.id, event.id)
+    
+    (notification,) = _open_matches(db, user.id, event.id)
+    assert notification.actor_count == 1
+    assert notification.content == f"You and {friend.username} both liked the event '{event.title}'!"
+
+
+def test_concurrent_matches_coalesce_into_one_notification(db, run_concurrently, make_user, make_event):
+    user = make_user()
+    friends = [make_user() for _ in range(4)]
+    event = make_event()
+    _befriend_and_like(db, user, friends, event)
+    
+    outcomes = run_concurrently(
+        NotificationService.notify_event_match,
+        [(friend.id, event.id) for friend in friends]
+    )
+    
+    assert not [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    (notification,) = _open_matches(db, user.id, event.id)
+    assert notification.actor_count == len(friends)
+    assert sorted(notification.actor_ids) == sorted(friend.id for friend in friends)
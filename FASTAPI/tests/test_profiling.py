@@ -0,0 +1,70 @@
+# FASTAPI/tests/test_profiling.py
+import asyncio
+import logging
+
+import pytest
+
+try:
+    from app import oauth2
+    from app.config import settings
+    from app.middleware.profiling import ProfilingMiddleware
+except Exception as e:  # settings need the deployment's environment
+    pytest.skip(f"app cannot be imported here: {e}", allow_module_level=True)
+
+ADMIN_ID = 7
+PROFILING_TOKEN = "profile-me"
+
+
+@pytest.fixture(autouse=True)
+def profiling_settings(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", PROFILING_TOKEN)
+    monkeypatch.setattr(settings, "ADMIN_USER_IDS", [ADMIN_ID])
+    monkeypatch.setattr(oauth2.TokenService, "is_blacklisted", staticmethod(lambda token: False))
+
+
+def _call(headers):
+    """Run one GET through the middleware; returns the response start message"""
+    scope = {"type": "http", "method": "GET", "path": "/events", "headers": headers}
+    sent = []
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        sent.append(message)
+    
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"[]"})
+    
+    asyncio.run(ProfilingMiddleware(app)(scope, receive, send))
+    return sent[0]
+
+
+def _bearer(user_id):
+    return (b"authorization", f"Bearer {oauth2.create_access_token({'user_id': user_id})}".encode())
+
+
+def _profiled(start) -> bool:
+    return any(name == b"x-profiled-status" for name, _ in start["headers"])
+
+
+def test_profile_token_alone_is_not_enough():
+    assert not _profiled(_call([(b"x-profile", PROFILING_TOKEN.encode())]))
+
+
+def test_non_admin_is_not_profiled():
+    assert not _profiled(_call([(b"x-profile", PROFILING_TOKEN.encode()), _bearer(ADMIN_ID + 1)]))
+
+
+def test_wrong_profile_token_is_not_profiled():
+    assert not _profiled(_call([(b"x-profile", b"guess"), _bearer(ADMIN_ID)]))
+
+
+def test_admin_with_profile_token_is_profiled(caplog, monkeypatch):
+    # The app logger does not propagate once app.main is imported
+    monkeypatch.setattr(logging.getLogger("app"), "propagate", True)
+    with caplog.at_level("INFO", logger="app.middleware.profiling"):
+        start = _call([(b"x-profile", PROFILING_TOKEN.encode()), _bearer(ADMIN_ID)])
+    assert _profiled(start)
+    assert f"for admin {ADMIN_ID}" in caplog.text
@@ -0,0 +1,72 @@
+# FASTAPI/tests/test_rfc_responses.py
+"""
+The RFC read endpoints skip response_model validation (_trusted_response).
+Their bytes must stay identical to what FastAPI would send after validating
+and serializing the same content through the response_model.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+
+try:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import ORJSONResponse
+    from pydantic import TypeAdapter
+    
+    from app import models, schemas
+    from app.routers import rfc
+except Exception as e:  # dependencies or the deployment's settings are missing
+    pytest.skip(f"app cannot be imported here: {e}", allow_module_level=True)
+
+# Whole seconds, microseconds with trailing zeros, UTC and a non-UTC offset
+TIMESTAMPS = [
+    datetime(2026, 10, 19, 12, 0, 0, tzinfo=timezone.utc),
+    datetime(2026, 10, 19, 12, 0, 0, 120000, tzinfo=timezone.utc),
+    datetime(2026, 10, 19, 14, 30, 5, 123456, tzinfo=timezone(timedelta(hours=2))),
+]
+
+
+def _validated_body(response_model, content) -> bytes:
+    validated = TypeAdapter(response_model).validate_python(content)
+    return ORJSONResponse(jsonable_encoder(validated)).body
+
+
+def _author(user_id: int) -> models.User:
+    return models.User(id=user_id, username=f"user{user_id}", profile_picture=None)
+
+
+def _reply(reply_id: int, created_at: datetime) -> models.CommentReply:
+    return models.CommentReply(
+        id=reply_id, content="A reply", comment_id=1, author_id=2, like_count=0,
+        created_at=created_at, updated_at=created_at, author=_author(2)
+    )
+
+
+@pytest.mark.parametrize("created_at", TIMESTAMPS)
+def test_features_match_response_model(created_at):
+    feature = models.Feature(
+        id=1, title="Dark mode", description="Please", vote_count=3,
+        created_at=created_at, updated_at=created_at, created_by=None
+    )
+    content = [rfc._feature_dict(feature, {1})]
+    
+    assert rfc._trusted_response(content).body == _validated_body(List[schemas.FeatureResponse], content)
+
+
+@pytest.mark.parametrize("created_at", TIMESTAMPS)
+def test_comments_match_response_model(created_at):
+    comment = models.Comment(
+        id=1, content="A comment", author_id=1, like_count=2, reply_count=1,
+        created_at=created_at, updated_at=created_at, author=_author(1)
+    )
+    content = [rfc._comment_dict(comment, [_reply(5, created_at)])]
+    
+    assert rfc._trusted_response(content).body == _validated_body(List[schemas.CommentResponse], content)
+
+
+@pytest.mark.parametrize("created_at", TIMESTAMPS)
+def test_replies_match_response_model(created_at):
+    content = [rfc._reply_dict(_reply(5, created_at), {5})]
+    
+    assert rfc._trusted_response(content).body == _validated_body(List[schemas.CommentReplyResponse], content)